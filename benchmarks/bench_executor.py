@@ -0,0 +1,89 @@
+"""Throughput of the in-process executors as worker count grows.
+
+Runs the same CPU-heavy job (pdf-to-images) through ``TaskBackend`` with the
+thread pool and with the process pool, for 1..N workers, and prints jobs/s.
+
+    python -m benchmarks.bench_executor --jobs 16 --pages 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+from essential_tools.extensions import TaskBackend
+from essential_tools.models.job import Job
+from essential_tools.tasks.jobs import dispatch_tool, init_worker, worker_settings
+
+from .corpus import text_heavy_pdf
+
+
+def _worker_counts(limit: int) -> list[int]:
+    counts = []
+    n = 1
+    while n < limit:
+        counts.append(n)
+        n *= 2
+    counts.append(limit)
+    return counts
+
+
+def _run(mode: str, workers: int, jobs: int, src: str, jobs_dir: str, dpi: int) -> float:
+    app = Flask("bench")
+    app.config.update(
+        USE_RQ=False,
+        RESULT_CACHE_ENABLED=False,
+        WORKER_THREADS=workers,
+        WORKER_PROCESSES=workers if mode == "process" else 0,
+        INTERACTIVE_PROCESSES=0,
+        PROCESS_POOL_TOOLS=["pdf-to-images"] if mode == "process" else [],
+        BATCH_TOOLS=["pdf-to-images"],
+    )
+    init_worker(worker_settings(app.config))
+    backend = TaskBackend()
+    backend.init_app(app)
+
+    pool = backend.lanes["batch"].process_executor
+    if pool:
+        # Warm up worker processes so interpreter start-up is not measured
+        list(pool.map(abs, range(workers)))
+
+    start = time.perf_counter()
+    futures = []
+    for _ in range(jobs):
+        job = Job.new(jobs_dir, tool="pdf-to-images", options={"dpi": dpi})
+        futures.append(backend.enqueue(dispatch_tool, job.to_dict(), [src], tool=job.tool))
+    for f in futures:
+        f.result()
+    elapsed = time.perf_counter() - start
+
+    backend.shutdown()
+    return jobs / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "input.pdf")
+        text_heavy_pdf(src, pages=args.pages)
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+
+        print(f"{'workers':>8} {'thread jobs/s':>14} {'process jobs/s':>15} {'speedup':>8}")
+        for workers in _worker_counts(args.max_workers):
+            threads = _run("thread", workers, args.jobs, src, jobs_dir, args.dpi)
+            procs = _run("process", workers, args.jobs, src, jobs_dir, args.dpi)
+            print(f"{workers:>8} {threads:>14.2f} {procs:>15.2f} {procs / threads:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
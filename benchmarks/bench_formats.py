@@ -0,0 +1,62 @@
+"""Encode time and output size per page-image format.
+
+Renders the text-heavy and image-heavy corpora once per format/colorspace
+(the same path pdf-to-images and pdf-to-pptx use) and prints the mean
+encode time and bytes per page.
+
+    python -m benchmarks.bench_formats --pages 10 --dpi 150
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from essential_tools.utils.raster import COLORSPACES, FORMATS, RenderSpec, encode, resolve_format, webp_supported
+
+from .corpus import image_heavy_pdf, text_heavy_pdf
+
+
+def _measure(src: str, spec: RenderSpec) -> tuple[float, float, float]:
+    import fitz  # PyMuPDF
+
+    render = encode_time = size = 0.0
+    with fitz.open(src) as doc:
+        cs = fitz.csGRAY if spec.colorspace == "gray" else fitz.csRGB
+        for page in doc:
+            started = time.perf_counter()
+            pix = page.get_pixmap(matrix=fitz.Matrix(spec.zoom, spec.zoom), colorspace=cs, alpha=False)
+            rendered = time.perf_counter()
+            data = encode(pix, resolve_format(page, spec), spec.quality)
+            encode_time += time.perf_counter() - rendered
+            render += rendered - started
+            size += len(data)
+        pages = doc.page_count
+    return render / pages, encode_time / pages, size / pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--quality", type=int, default=85)
+    args = parser.parse_args()
+
+    formats = [f for f in FORMATS if f != "webp" or webp_supported()] + ["auto"]
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = {
+            "text": text_heavy_pdf(os.path.join(tmp, "text.pdf"), pages=args.pages),
+            "image": image_heavy_pdf(os.path.join(tmp, "image.pdf"), pages=args.pages),
+        }
+        print(f"{'corpus':<7} {'format':<6} {'color':<5} {'render ms':>10} {'encode ms':>10} {'KiB/page':>10}")
+        for name, src in docs.items():
+            for fmt in formats:
+                for cs in COLORSPACES:
+                    spec = RenderSpec(dpi=args.dpi, format=fmt, quality=args.quality, colorspace=cs)
+                    render, enc, size = _measure(src, spec)
+                    print(f"{name:<7} {fmt:<6} {cs:<5} {render * 1000:>10.1f} {enc * 1000:>10.1f} {size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
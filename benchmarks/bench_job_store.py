@@ -0,0 +1,75 @@
+"""Status-poll throughput of the SQLite and filesystem job stores.
+
+Creates N jobs, then times ``Job.load`` (what ``GET /api/jobs/<id>`` does)
+while a writer thread keeps updating progress, plus list/count queries.
+
+    python -m benchmarks.bench_job_store --jobs 2000 --polls 20000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from essential_tools.models import job_store
+from essential_tools.models.job import Job
+
+
+def _run(backend: str, root: str, jobs: int, polls: int) -> dict:
+    jobs_dir = os.path.join(root, backend)
+    os.makedirs(jobs_dir)
+    job_store.configure(backend)
+
+    created = [Job.new(jobs_dir, tool=random.choice(["merge", "split", "rotate"])) for _ in range(jobs)]
+    ids = [j.id for j in created]
+
+    stop = threading.Event()
+    writes = 0
+
+    def writer() -> None:
+        nonlocal writes
+        while not stop.is_set():
+            job = random.choice(created)
+            job.update(status="running", progress=random.randint(0, 100))
+            writes += 1
+
+    t = threading.Thread(target=writer, daemon=True)
+    t.start()
+    start = time.perf_counter()
+    for _ in range(polls):
+        Job.load(jobs_dir, random.choice(ids))
+    poll_elapsed = time.perf_counter() - start
+    stop.set()
+    t.join()
+
+    start = time.perf_counter()
+    for _ in range(20):
+        Job.query(jobs_dir, limit=50, status="running")
+        Job.count(jobs_dir, tool="merge")
+    list_elapsed = (time.perf_counter() - start) / 20
+
+    return {
+        "polls_per_s": polls / poll_elapsed,
+        "writes_per_s": writes / poll_elapsed,
+        "list_count_ms": list_elapsed * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--polls", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'store':>10} {'polls/s':>10} {'writes/s':>10} {'list+count ms':>14}")
+        for backend in job_store.BACKENDS:
+            r = _run(backend, tmp, args.jobs, args.polls)
+            print(f"{backend:>10} {r['polls_per_s']:>10.0f} {r['writes_per_s']:>10.0f} {r['list_count_ms']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Latency of small interactive jobs while the batch lane is saturated.
+
+Submits a burst of heavy pdf-to-images jobs, then a stream of 1-page rotate
+jobs, and reports rotate latency percentiles with lanes enabled versus every
+job sharing the batch lane (the old single-FIFO behaviour).
+
+    python -m benchmarks.bench_lanes --heavy 16 --light 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+from essential_tools.extensions import TaskBackend
+from essential_tools.models.job import Job
+from essential_tools.models.tools import all_tools
+from essential_tools.tasks.jobs import dispatch_tool, init_worker, worker_settings
+
+from .corpus import text_heavy_pdf
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _run(single_lane: bool, heavy: int, light: int, heavy_src: str, light_src: str, jobs_dir: str) -> dict:
+    app = Flask("bench")
+    app.config.update(
+        USE_RQ=False,
+        RESULT_CACHE_ENABLED=False,
+        WORKER_THREADS=2,
+        WORKER_PROCESSES=0,
+        INTERACTIVE_THREADS=1,
+        INTERACTIVE_PROCESSES=0,
+        BATCH_TOOLS=[t.slug for t in all_tools()] if single_lane else ["pdf-to-images"],
+    )
+    init_worker(worker_settings(app.config))
+    backend = TaskBackend()
+    backend.init_app(app)
+
+    heavy_futures = []
+    for _ in range(heavy):
+        job = Job.new(jobs_dir, tool="pdf-to-images", options={"dpi": 150})
+        heavy_futures.append(backend.enqueue(dispatch_tool, job.to_dict(), [heavy_src], tool=job.tool, inputs=[heavy_src]))
+
+    latencies = []
+    for _ in range(light):
+        job = Job.new(jobs_dir, tool="rotate", options={"degrees": 90})
+        start = time.perf_counter()
+        backend.enqueue(dispatch_tool, job.to_dict(), [light_src], tool=job.tool, inputs=[light_src]).result()
+        latencies.append(time.perf_counter() - start)
+
+    for f in heavy_futures:
+        f.result()
+    stats = backend.stats()
+    backend.shutdown()
+    return {"p50": _pct(latencies, 0.5), "p99": _pct(latencies, 0.99), "lanes": stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--heavy", type=int, default=16)
+    parser.add_argument("--light", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        heavy_src = os.path.join(tmp, "heavy.pdf")
+        light_src = os.path.join(tmp, "light.pdf")
+        text_heavy_pdf(heavy_src, pages=args.pages)
+        text_heavy_pdf(light_src, pages=1)
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+
+        for label, single in (("single lane", True), ("lanes", False)):
+            r = _run(single, args.heavy, args.light, heavy_src, light_src, jobs_dir)
+            print(f"{label:>12}: rotate p50={r['p50'] * 1000:.1f}ms p99={r['p99'] * 1000:.1f}ms")
+            for name, lane in r["lanes"].items():
+                print(f"{'':>14}{name}: wait {lane['wait_seconds']}")
+
+
+if __name__ == "__main__":
+    main()
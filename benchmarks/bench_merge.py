@@ -0,0 +1,79 @@
+"""Merge engines compared on many small files and on a few large ones.
+
+Runs the pypdf and PyMuPDF engines, each in a fresh process, and prints
+runtime, output size and how much the merge raised the worker's peak RSS.
+
+    python -m benchmarks.bench_merge --files 300
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Dict, List
+
+from .corpus import image_heavy_pdf, many_page_pdf, many_small_pdfs
+
+ENGINES = (
+    ("pypdf", {"engine": "pypdf"}),
+    ("pymupdf", {"engine": "pymupdf"}),
+)
+
+
+def _merge(jobs_dir: str, paths: List[str], options: Dict, out) -> None:
+    from essential_tools.models.job import Job
+    from essential_tools.models.tools import merge
+
+    job = Job.new(jobs_dir, tool="merge", options=options)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    merged = merge.process(job, paths)["files"][0]
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; report growth over the imported interpreter
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    out.put((elapsed, os.path.getsize(merged), peak))
+
+
+def _run(jobs_dir: str, paths: List[str], options: Dict) -> tuple:
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_merge, args=(jobs_dir, paths, options, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=300, help="inputs in the many-file corpus")
+    parser.add_argument("--large", type=int, default=4, help="inputs in the large-file corpus")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+        large = []
+        for i in range(args.large):
+            make = image_heavy_pdf if i % 2 else many_page_pdf
+            large.append(make(os.path.join(tmp, f"large_{i}.pdf"), seed=100 + i))
+        corpora = {
+            "many_small": many_small_pdfs(os.path.join(tmp, "small"), count=args.files),
+            "large": large,
+        }
+        print(f"{'corpus':<11} {'engine':<8} {'inputs KiB':>11} {'seconds':>8} {'output KiB':>11} {'+peak RSS MiB':>14}")
+        for name, paths in corpora.items():
+            size_in = sum(os.path.getsize(p) for p in paths)
+            for engine, options in ENGINES:
+                elapsed, size_out, rss = _run(jobs_dir, paths, options)
+                print(
+                    f"{name:<11} {engine:<8} {size_in / 1024:>11.0f} {elapsed:>8.2f}"
+                    f" {size_out / 1024:>11.0f} {rss / 1024:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Serial vs sharded page rendering in pdf-to-images.
+
+Renders the same document with one worker (the serial path) and with 2..N
+worker processes, and prints pages/s and the speedup over serial.
+
+    python -m benchmarks.bench_render --pages 120 --dpi 300
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from essential_tools.models.job import Job
+from essential_tools.models.tools import pdf_to_images
+from essential_tools.utils import parallel
+
+from .bench_executor import _worker_counts
+from .corpus import image_heavy_pdf, text_heavy_pdf
+
+
+def _run(workers: int, src: str, jobs_dir: str, dpi: int) -> float:
+    parallel.configure(workers=workers)
+    if workers > 1:
+        # Warm up worker processes so interpreter start-up is not measured
+        parallel.run_sharded(abs, [(i,) for i in range(workers)])
+    job = Job.new(jobs_dir, tool="pdf-to-images", options={"dpi": dpi})
+    start = time.perf_counter()
+    pdf_to_images.process(job, [src])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--kind", choices=("text", "image"), default="text")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "input.pdf")
+        (text_heavy_pdf if args.kind == "text" else image_heavy_pdf)(src, pages=args.pages)
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+
+        print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+        serial = None
+        for workers in _worker_counts(args.max_workers):
+            elapsed = _run(workers, src, jobs_dir, args.dpi)
+            serial = serial or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.pages / elapsed:>9.1f} {serial / elapsed:>7.2f}x")
+        parallel.configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Splitting a long document into many parts.
+
+Compares the previous implementation (one pypdf PdfWriter per range, parts
+written one after another) with split.process using 1..N worker processes,
+and prints the time for each.
+
+    python -m benchmarks.bench_split --pages 2000 --every 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from essential_tools.models.job import Job
+from essential_tools.models.tools import split
+from essential_tools.utils import parallel
+
+from .bench_executor import _worker_counts
+from .corpus import text_heavy_pdf
+
+
+def _pypdf_split(src: str, out_dir: str, every: int) -> None:
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(src)
+    for idx, (start, end) in enumerate(split._every(every, len(reader.pages)), start=1):
+        writer = PdfWriter()
+        for i in range(start - 1, end):
+            writer.add_page(reader.pages[i])
+        with open(os.path.join(out_dir, f"splited_part{idx}.pdf"), "wb") as f:
+            writer.write(f)
+
+
+def _run(workers: int, src: str, jobs_dir: str, every: int) -> float:
+    parallel.configure(workers=workers)
+    if workers > 1:
+        # Warm up worker processes so interpreter start-up is not measured
+        parallel.run_sharded(abs, [(i,) for i in range(workers)])
+    job = Job.new(jobs_dir, tool="split", options={"mode": "every", "pages": every})
+    start = time.perf_counter()
+    split.process(job, [src])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--every", type=int, default=10)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = text_heavy_pdf(os.path.join(tmp, "input.pdf"), pages=args.pages)
+        jobs_dir = os.path.join(tmp, "jobs")
+        old_dir = os.path.join(tmp, "old")
+        os.makedirs(jobs_dir)
+        os.makedirs(old_dir)
+        parts = -(-args.pages // args.every)
+
+        print(f"{'variant':<16} {'seconds':>9} {'parts/s':>9} {'speedup':>8}")
+        start = time.perf_counter()
+        _pypdf_split(src, old_dir, args.every)
+        baseline = time.perf_counter() - start
+        print(f"{'pypdf serial':<16} {baseline:>9.2f} {parts / baseline:>9.1f} {1:>7.2f}x")
+        for workers in _worker_counts(args.max_workers):
+            elapsed = _run(workers, src, jobs_dir, args.every)
+            label = f"{workers} worker" + ("s" if workers > 1 else "")
+            print(f"{label:<16} {elapsed:>9.2f} {parts / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+        parallel.configure()
+
+
+if __name__ == "__main__":
+    main()
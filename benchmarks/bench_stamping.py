@@ -0,0 +1,84 @@
+"""Cost of stamping watermarks onto every page of a large document.
+
+Compares drawing on each page separately (the old behaviour: the image
+stream passed to every placement, text inserted tile by tile) with the
+current watermark.apply, which embeds images once and stamps tiled and
+text layers from a per-page-size template. Prints runtime and output size.
+
+    python -m benchmarks.bench_stamping --pages 40
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from essential_tools.models.tools import watermark
+
+from .corpus import many_page_pdf, watermark_png
+
+CASES = (
+    ("image", "center"),
+    ("image", "stretch"),
+    ("text", "tile"),
+    ("text", "center"),
+)
+
+
+class _Job:
+    def __init__(self, mode: str, style: str) -> None:
+        self.options = {"mode": mode, "style": style}
+
+
+def _per_page(doc, image: str, mode: str, style: str) -> None:
+    if mode == "image":
+        base = watermark._prepare_watermark_image(image, 0.2)
+        stream, w_px, h_px = watermark._image_to_bytes(base)
+        for page in doc:
+            watermark._apply_image(page, stream, (w_px, h_px), style)
+    else:
+        for page in doc:
+            watermark._draw_text(page, "CONFIDENTIAL", "Helvetica", 48, style, False, False, False)
+
+
+def _run(src: str, image: str, mode: str, style: str, current: bool) -> tuple[float, int]:
+    import fitz  # type: ignore
+
+    doc = fitz.open(src)
+    start = time.perf_counter()
+    if current:
+        watermark.apply(_Job(mode, style), doc, [image] if mode == "image" else [])
+    else:
+        _per_page(doc, image, mode, style)
+    data = doc.tobytes(garbage=3, deflate=True)
+    elapsed = time.perf_counter() - start
+    doc.close()
+    return elapsed, len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--skip-image-tile", action="store_true", help="the per-page image tile run is very slow")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = many_page_pdf(os.path.join(tmp, "input.pdf"), pages=args.pages)
+        image = watermark_png(os.path.join(tmp, "watermark.png"))
+        print(
+            f"{'mode':<6} {'style':<9} {'per-page s':>11} {'current s':>10} {'speedup':>8}"
+            f" {'per-page KiB':>13} {'current KiB':>12}"
+        )
+        cases = CASES if args.skip_image_tile else (("image", "tile"),) + CASES
+        for mode, style in cases:
+            old_s, old_b = _run(src, image, mode, style, current=False)
+            new_s, new_b = _run(src, image, mode, style, current=True)
+            print(
+                f"{mode:<6} {style:<9} {old_s:>11.2f} {new_s:>10.2f} {old_s / new_s:>7.2f}x"
+                f" {old_b / 1024:>13.1f} {new_b / 1024:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Line wrapping in the html-to-pdf and word-to-pdf PyMuPDF fallbacks.
+
+Converts a large HTML file, a large DOCX and an HTML export with one very
+long paragraph, first the previous way (re-measuring the whole candidate
+line for every word, one insert_text call per line) and then with
+utils.text_layout. Prints timings and output sizes, and checks that the
+wrapped lines are identical.
+
+    python -m benchmarks.bench_text_layout --paragraphs 2000 --long-words 20000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from essential_tools.models.job import Job
+from essential_tools.models.tools import html_to_pdf, word_to_pdf
+from essential_tools.utils import text_layout
+
+from .corpus import _WORDS, large_docx, large_html
+
+
+def _old_wrap(text: str, max_width: float, font: str, size: float) -> List[str]:
+    import fitz  # type: ignore
+
+    lines: List[str] = []
+    line = ""
+    for word in text.split():
+        candidate = (line + " " + word) if line else word
+        if fitz.get_text_length(candidate, fontname=font, fontsize=size) <= max_width:
+            line = candidate
+        else:
+            if line:
+                lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _old_write_pages(doc, paragraphs, width, height, margin, font, size, line_height, paragraph_gap) -> None:
+    page = doc.new_page(width=width, height=height)
+    y = margin
+    for lines in paragraphs:
+        for line in lines:
+            if y + line_height > height - margin:
+                page = doc.new_page(width=width, height=height)
+                y = margin
+            page.insert_text((margin, y), line, fontname=font, fontsize=size)
+            y += line_height
+        y += paragraph_gap
+
+
+def _recording(fn, out: List[List[str]]):
+    def wrap(text, max_width, font, size):
+        lines = fn(text, max_width, font, size)
+        out.append(lines)
+        return lines
+
+    return wrap
+
+
+def _convert(jobs_dir: str, src: str, previous: bool) -> tuple:
+    tool, module = ("word-to-pdf", word_to_pdf) if src.endswith(".docx") else ("html-to-pdf", html_to_pdf)
+    lines: List[List[str]] = []
+    module.wrap = _recording(_old_wrap if previous else text_layout.wrap, lines)
+    if previous:
+        module.write_pages = _old_write_pages
+    try:
+        job = Job.new(jobs_dir, tool=tool, options={})
+        start = time.perf_counter()
+        out = module.process(job, [src])["files"][0]
+        return time.perf_counter() - start, os.path.getsize(out), lines
+    finally:
+        module.wrap = text_layout.wrap
+        module.write_pages = text_layout.write_pages
+
+
+def _long_paragraph_html(path: str, words: int, seed: int = 11) -> str:
+    # An export that lost its paragraph breaks: one <p> with every word
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><body><p>" + " ".join(rng.choice(_WORDS) for _ in range(words)) + "</p></body></html>")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--long-words", type=int, default=20000, help="words in the single-paragraph export")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+        inputs = {
+            "large html": large_html(os.path.join(tmp, "large.html"), paragraphs=args.paragraphs),
+            "large docx": large_docx(os.path.join(tmp, "large.docx"), paragraphs=args.paragraphs),
+            "long paragraph": _long_paragraph_html(os.path.join(tmp, "long.html"), args.long_words),
+        }
+        print(
+            f"{'input':<15} {'KiB':>6} {'previous s':>11} {'layout s':>9} {'speedup':>8}"
+            f" {'previous KiB':>13} {'layout KiB':>11} {'same lines':>11}"
+        )
+        for name, src in inputs.items():
+            old_s, old_b, old_lines = _convert(jobs_dir, src, previous=True)
+            new_s, new_b, new_lines = _convert(jobs_dir, src, previous=False)
+            print(
+                f"{name:<15} {os.path.getsize(src) / 1024:>6.0f} {old_s:>11.2f} {new_s:>9.2f} {old_s / new_s:>7.1f}x"
+                f" {old_b / 1024:>13.0f} {new_b / 1024:>11.0f} {str(old_lines == new_lines):>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
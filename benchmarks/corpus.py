@@ -0,0 +1,278 @@
+"""Deterministic synthetic inputs for the benchmarks.
+
+Every generator takes a seed so two runs on different machines (or before
+and after a change) process byte-identical inputs.
+
+    python -m benchmarks.corpus /tmp/corpus --scale medium
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import zipfile
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+# Multipliers applied to the page/file/paragraph counts below
+SCALES = {"small": 1, "medium": 4, "large": 16}
+
+_WORDS = (
+    "invoice contract statement agreement payment balance account party clause term schedule "
+    "annex signature witness date amount total tax due period notice delivery service provider "
+    "customer company limited confidential document section reference number page report"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 6) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(sentences))
+
+
+def _photo(rng: random.Random, width: int, height: int, fmt: str = "JPEG") -> bytes:
+    # Smooth gradient plus noise: compresses like a photographic scan, not like line art
+    from PIL import Image, ImageFilter  # type: ignore
+
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.frombytes("L", (width, height), rng.randbytes(width * height))
+    r = Image.blend(base, noise, 0.35)
+    g = Image.blend(base.rotate(90).resize((width, height)), noise, 0.25)
+    b = noise.filter(ImageFilter.GaussianBlur(2))
+    img = Image.merge("RGB", (r, g, b))
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+def _save_pdf(doc, path: str) -> None:
+    # no_new_id keeps the trailer /ID (random by default) stable between runs
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def _write_zip(path: str, entries: List[tuple]) -> None:
+    # Fixed timestamps so archives are byte-identical between runs
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=(2000, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+
+
+def text_heavy_pdf(path: str, pages: int = 20, seed: int = 1) -> str:
+    import fitz  # type: ignore
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((54, 54), f"Section {i + 1}", fontsize=16)
+        body = "\n\n".join(_paragraph(rng) for _ in range(5))
+        page.insert_textbox(fitz.Rect(54, 72, page.rect.width - 54, page.rect.height - 54), body, fontsize=10)
+        for k in range(12):
+            page.draw_line((54, 760 + k), (540, 760 + k), color=(0.8, 0.8, 0.8), width=0.3)
+    _save_pdf(doc, path)
+    return path
+
+
+def image_heavy_pdf(path: str, pages: int = 10, seed: int = 2) -> str:
+    import fitz  # type: ignore
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        # Roughly 300 DPI across a letter-width page
+        page.insert_image(page.rect, stream=_photo(rng, 1700, 2200))
+    _save_pdf(doc, path)
+    return path
+
+
+def many_page_pdf(path: str, pages: int = 300, seed: int = 3) -> str:
+    import fitz  # type: ignore
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((54, 72), f"Page {i + 1}: {_sentence(rng)}", fontsize=11)
+    _save_pdf(doc, path)
+    return path
+
+
+def many_small_pdfs(out_dir: str, count: int = 40, seed: int = 4) -> List[str]:
+    import fitz  # type: ignore
+
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    letterhead = _photo(rng, 600, 120)
+    paths = []
+    for i in range(count):
+        doc = fitz.open()
+        for _ in range(rng.randint(1, 3)):
+            page = doc.new_page()
+            # Same letterhead in every file, as in a batch of statements
+            page.insert_image(fitz.Rect(54, 36, 354, 96), stream=letterhead)
+            page.insert_textbox(fitz.Rect(54, 120, 540, 760), _paragraph(rng, 8), fontsize=10)
+        path = os.path.join(out_dir, f"statement_{i + 1:04d}.pdf")
+        _save_pdf(doc, path)
+        paths.append(path)
+    return paths
+
+
+def images(out_dir: str, count: int = 10, seed: int = 5) -> List[str]:
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(out_dir, f"scan_{i + 1:03d}.jpg")
+        with open(path, "wb") as f:
+            f.write(_photo(rng, 1240, 1754))
+        paths.append(path)
+    return paths
+
+
+def signature_png(path: str, seed: int = 6) -> str:
+    # Phone-photo-sized signature: dark strokes on an off-white background
+    from PIL import Image, ImageDraw  # type: ignore
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (3000, 1500), (238, 236, 230))
+    draw = ImageDraw.Draw(img)
+    x, y = 300, 750
+    for _ in range(60):
+        nx, ny = x + rng.randint(20, 60), 750 + rng.randint(-300, 300)
+        draw.line((x, y, nx, ny), fill=(20, 24, 60), width=14)
+        x, y = nx, ny
+    img.save(path, format="PNG")
+    return path
+
+
+def watermark_png(path: str, seed: int = 7) -> str:
+    from PIL import Image, ImageDraw  # type: ignore
+
+    rng = random.Random(seed)
+    img = Image.new("RGBA", (800, 400), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randint(0, 760), rng.randint(0, 360)
+        draw.ellipse((x, y, x + 40, y + 40), fill=(200, 30, 30, 200))
+    img.save(path, format="PNG")
+    return path
+
+
+def large_html(path: str, paragraphs: int = 400, seed: int = 8) -> str:
+    rng = random.Random(seed)
+    parts = ["<html><head><meta charset='utf-8'><title>Report</title></head><body>"]
+    for i in range(paragraphs):
+        if i % 25 == 0:
+            parts.append(f"<h2>Chapter {i // 25 + 1}</h2>")
+        parts.append(f"<p>{escape(_paragraph(rng, rng.randint(4, 12)))}</p>")
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return path
+
+
+def large_docx(path: str, paragraphs: int = 400, seed: int = 9) -> str:
+    # Minimal WordprocessingML package; no python-docx needed
+    rng = random.Random(seed)
+    body = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(_paragraph(rng, rng.randint(4, 12)))}</w:t></w:r></w:p>"
+        for _ in range(paragraphs)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    _write_zip(
+        path,
+        [("[Content_Types].xml", content_types), ("_rels/.rels", rels), ("word/document.xml", document)],
+    )
+    return path
+
+
+def large_pptx(path: str, slides: int = 40, seed: int = 10) -> str | None:
+    try:
+        from pptx import Presentation  # type: ignore
+        from pptx.util import Inches, Pt
+    except Exception:
+        return None
+    rng = random.Random(seed)
+    picture = io.BytesIO(_photo(rng, 960, 540))
+    import datetime
+
+    prs = Presentation()
+    stamp = datetime.datetime(2000, 1, 1)
+    prs.core_properties.created = prs.core_properties.modified = stamp
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.4), Inches(9), Inches(1.5))
+        box.text_frame.text = f"Slide {i + 1}: {_sentence(rng)}"
+        box.text_frame.paragraphs[0].runs[0].font.size = Pt(20)
+        picture.seek(0)
+        slide.shapes.add_picture(picture, Inches(1), Inches(2), width=Inches(8))
+    buf = io.BytesIO()
+    prs.save(buf)
+    with zipfile.ZipFile(buf) as zf:
+        entries = [(info.filename, zf.read(info)) for info in zf.infolist()]
+    _write_zip(path, entries)
+    return path
+
+
+def build_corpus(root: str, scale: str = "small") -> Dict[str, List[str]]:
+    """Generate every input once under ``root``; returns name -> paths."""
+    n = SCALES[scale]
+    os.makedirs(root, exist_ok=True)
+    p = lambda name: os.path.join(root, name)  # noqa: E731
+    corpus: Dict[str, List[str]] = {
+        "text_heavy": [text_heavy_pdf(p("text_heavy.pdf"), pages=20 * n)],
+        "image_heavy": [image_heavy_pdf(p("image_heavy.pdf"), pages=4 * n)],
+        "many_page": [many_page_pdf(p("many_page.pdf"), pages=150 * n)],
+        "many_small": many_small_pdfs(p("many_small"), count=20 * n),
+        "images": images(p("images"), count=5 * n),
+        "signature": [signature_png(p("signature.png"))],
+        "watermark": [watermark_png(p("watermark.png"))],
+        "large_html": [large_html(p("large.html"), paragraphs=200 * n)],
+        "large_docx": [large_docx(p("large.docx"), paragraphs=200 * n)],
+    }
+    pptx = large_pptx(p("large.pptx"), slides=10 * n)
+    if pptx:
+        corpus["large_pptx"] = [pptx]
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    args = parser.parse_args()
+    for name, paths in build_corpus(args.root, args.scale).items():
+        size = sum(os.path.getsize(x) for x in paths)
+        print(f"{name:>12}: {len(paths):>4} file(s) {size / 1024:>10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
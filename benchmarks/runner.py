@@ -0,0 +1,254 @@
+"""Per-tool benchmark runner with JSON results and regression checks.
+
+Each case runs every tool on a synthetic corpus (see ``corpus.py``) twice:
+calling ``Tool.processor`` directly, and through ``dispatch_tool`` (job store
+updates, manifest building). Every run happens in a fresh process so peak RSS
+belongs to that run alone.
+
+    python -m benchmarks.runner run --scale small --repeat 3 --out base.json
+    python -m benchmarks.runner run --tools merge,split --baseline base.json
+    python -m benchmarks.runner compare base.json new.json --wall 0.15
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from .corpus import SCALES, build_corpus
+
+CASES: List[Dict[str, Any]] = [
+    {"name": "merge-many-small", "tool": "merge", "inputs": ["many_small"], "options": {}},
+    {"name": "split-many-page", "tool": "split", "inputs": ["many_page"], "options": {"ranges": "1-50,51-100,101-end"}},
+    {"name": "rotate-many-page", "tool": "rotate", "inputs": ["many_page"], "options": {"degrees": 90, "scope": "all"}},
+    {"name": "compress-image-heavy", "tool": "compress", "inputs": ["image_heavy"], "options": {"quality": "medium"}},
+    {"name": "pdf-to-images-text", "tool": "pdf-to-images", "inputs": ["text_heavy"], "options": {"dpi": 150}},
+    {"name": "pdf-to-pptx-text", "tool": "pdf-to-pptx", "inputs": ["text_heavy"], "options": {"dpi": 150}},
+    {"name": "pdf-to-word-text", "tool": "pdf-to-word", "inputs": ["text_heavy"], "options": {}},
+    {"name": "images-to-pdf", "tool": "images-to-pdf", "inputs": ["images"], "options": {}},
+    {"name": "sign-text", "tool": "sign", "inputs": ["text_heavy", "signature"], "options": {"remove_bg": True}},
+    {"name": "watermark-text-tile", "tool": "watermark", "inputs": ["text_heavy"], "options": {"mode": "text", "style": "tile"}},
+    {
+        "name": "watermark-image-tile",
+        "tool": "watermark",
+        "inputs": ["text_heavy", "watermark"],
+        "options": {"mode": "image", "style": "tile"},
+    },
+    {"name": "html-to-pdf-large", "tool": "html-to-pdf", "inputs": ["large_html"], "options": {}},
+    {"name": "word-to-pdf-large", "tool": "word-to-pdf", "inputs": ["large_docx"], "options": {}},
+    {"name": "pptx-to-pdf-large", "tool": "pptx-to-pdf", "inputs": ["large_pptx"], "options": {}},
+    {"name": "protect-text", "tool": "protect", "inputs": ["text_heavy"], "options": {"password": "bench"}},
+]
+
+MODES = ("direct", "dispatch")
+
+# Allowed relative increase before a metric counts as a regression
+DEFAULT_THRESHOLDS = {"wall_s": 0.20, "peak_rss_mb": 0.25, "output_bytes": 0.10}
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_once(tool_slug: str, options: Dict[str, Any], paths: List[str], jobs_dir: str, mode: str) -> Dict[str, Any]:
+    # Runs in a fresh child process
+    from essential_tools.models.job import Job
+    from essential_tools.models.tools import get as get_tool
+    from essential_tools.tasks.jobs import dispatch_tool
+    from essential_tools.utils import metrics, result_cache
+
+    result_cache.configure(enabled=False)
+    metrics.configure(False)
+    tool = get_tool(tool_slug)
+    job = Job.new(jobs_dir, tool=tool_slug, options=dict(options))
+    baseline_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    error = None
+    files: List[str] = []
+    try:
+        if mode == "direct":
+            processor = getattr(tool.processor, "__wrapped__", tool.processor)  # skip metrics wrapper
+            files = processor(job, list(paths)).get("files", [])
+        else:
+            dispatch_tool(job.to_dict(), list(paths))
+            done = Job.load(jobs_dir, job.id)
+            if done.status != "done":
+                error = done.error_message or done.status
+            files = [os.path.join(job.workspace_path, f["filename"]) for f in (done.result_manifest or {}).get("files", [])]
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": round(wall, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "import_rss_mb": baseline_rss,
+        "output_bytes": sum(os.path.getsize(f) for f in files if os.path.exists(f)),
+        "output_files": len(files),
+        "error": error,
+    }
+
+
+def _isolated(*args: Any) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_once, args)
+
+
+def _meta(scale: str, repeat: int) -> Dict[str, Any]:
+    try:
+        import fitz  # type: ignore
+
+        mupdf = fitz.VersionBind
+    except Exception:
+        mupdf = None
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        rev = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git": rev or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pymupdf": mupdf,
+        "scale": scale,
+        "repeat": repeat,
+    }
+
+
+def run(scale: str, repeat: int, tools: List[str] | None = None, modes: List[str] | None = None) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="et-bench-") as tmp:
+        corpus = build_corpus(os.path.join(tmp, "corpus"), scale)
+        jobs_dir = os.path.join(tmp, "jobs")
+        os.makedirs(jobs_dir)
+        for case in CASES:
+            if tools and case["tool"] not in tools:
+                continue
+            if any(key not in corpus for key in case["inputs"]):
+                continue
+            paths = [p for key in case["inputs"] for p in corpus[key]]
+            for mode in modes or MODES:
+                runs = [_isolated(case["tool"], case["options"], paths, jobs_dir, mode) for _ in range(repeat)]
+                walls = [r["wall_s"] for r in runs]
+                entry = {
+                    "case": case["name"],
+                    "tool": case["tool"],
+                    "mode": mode,
+                    "wall_s": round(statistics.median(walls), 4),
+                    "wall_min_s": min(walls),
+                    "peak_rss_mb": max((r["peak_rss_mb"] or 0) for r in runs) or None,
+                    "import_rss_mb": runs[0]["import_rss_mb"],
+                    "output_bytes": runs[-1]["output_bytes"],
+                    "output_files": runs[-1]["output_files"],
+                    "error": next((r["error"] for r in runs if r["error"]), None),
+                }
+                results.append(entry)
+                status = entry["error"] or "ok"
+                print(
+                    f"{entry['case']:<24} {mode:<8} {entry['wall_s']:>8.3f}s "
+                    f"{entry['peak_rss_mb'] or 0:>8.1f}MB {entry['output_bytes'] / 1024:>10.1f}KiB  {status}",
+                    flush=True,
+                )
+    return {"meta": _meta(scale, repeat), "results": results}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], thresholds: Dict[str, float]) -> List[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    base = {(r["case"], r["mode"]): r for r in baseline.get("results", [])}
+    regressions: List[str] = []
+    for r in current.get("results", []):
+        b = base.get((r["case"], r["mode"]))
+        if not b:
+            continue
+        label = f"{r['case']} [{r['mode']}]"
+        if r.get("error") and not b.get("error"):
+            regressions.append(f"{label}: now fails ({r['error']})")
+            continue
+        for metric, limit in thresholds.items():
+            old, new = b.get(metric), r.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > limit:
+                regressions.append(f"{label}: {metric} {old:g} -> {new:g} (+{change:.0%}, limit +{limit:.0%})")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_thresholds(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--wall", type=float, default=DEFAULT_THRESHOLDS["wall_s"])
+        p.add_argument("--rss", type=float, default=DEFAULT_THRESHOLDS["peak_rss_mb"])
+        p.add_argument("--size", type=float, default=DEFAULT_THRESHOLDS["output_bytes"])
+
+    p_run = sub.add_parser("run", help="run the benchmark cases")
+    p_run.add_argument("--scale", choices=sorted(SCALES), default="small")
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--tools", help="comma-separated tool slugs (default: all)")
+    p_run.add_argument("--modes", help="comma-separated subset of: " + ",".join(MODES))
+    p_run.add_argument("--out", help="results file (default: benchmarks/results/<scale>-<time>.json)")
+    p_run.add_argument("--baseline", help="compare against this results file and exit 1 on regression")
+    add_thresholds(p_run)
+
+    p_cmp = sub.add_parser("compare", help="compare two results files")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    add_thresholds(p_cmp)
+
+    args = parser.parse_args()
+    thresholds = {"wall_s": args.wall, "peak_rss_mb": args.rss, "output_bytes": args.size}
+
+    if args.command == "run":
+        tools = [t.strip() for t in args.tools.split(",")] if args.tools else None
+        modes = [m.strip() for m in args.modes.split(",")] if args.modes else None
+        current = run(args.scale, args.repeat, tools, modes)
+        out = args.out or os.path.join(
+            os.path.dirname(__file__), "results", f"{args.scale}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"results: {out}")
+        if not args.baseline:
+            return
+        baseline = _load(args.baseline)
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    regressions = compare(baseline, current, thresholds)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
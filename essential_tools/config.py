@@ -2,13 +2,71 @@ import os
 import tempfile
 
 
+def _env_list(name: str) -> list[str] | None:
+    raw = os.getenv(name)
+    if raw is None:
+        return None
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
 class Config:
     def __init__(self) -> None:
         self.SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
         self.MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 100 * 1024 * 1024))
         default_jobs = os.path.join(tempfile.gettempdir(), "essential_tools_jobs")
         self.JOBS_DIR = os.path.abspath(os.getenv("JOBS_DIR", default_jobs))
+        self.JOB_STORE = os.getenv("JOB_STORE", "sqlite").lower()  # "sqlite" or "filesystem"
         self.STORAGE_TTL_MINUTES = int(os.getenv("STORAGE_TTL_MINUTES", 60))
+        self.STORAGE_QUOTA_BYTES = int(os.getenv("STORAGE_QUOTA_BYTES", 0))  # 0 disables LRU eviction
+        # Queued/running jobs with no stored change (start, progress, batch item
+        # output) for this long are failed by the sweeper (their worker is
+        # gone) and their workspaces become collectable; 0 = never
+        self.STALE_JOB_MINUTES = int(os.getenv("STALE_JOB_MINUTES", 180))
+        self.SWEEP_INTERVAL_SECONDS = float(os.getenv("SWEEP_INTERVAL_SECONDS", 60))
+        self.SWEEPER_ENABLED = os.getenv("SWEEPER_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
         self.REDIS_URL = os.getenv("REDIS_URL", "")
         self.USE_RQ = os.getenv("USE_RQ", "true").lower() in {"1", "true", "yes", "y"}
         self.SENTRY_DSN = os.getenv("SENTRY_DSN", "")
+        self.METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
+        # In-process executors (used when RQ is disabled). WORKER_* size the
+        # batch lane; INTERACTIVE_* size the lane reserved for small jobs.
+        self.WORKER_THREADS = int(os.getenv("WORKER_THREADS", 4))
+        self.WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 1))
+        self.INTERACTIVE_THREADS = int(os.getenv("INTERACTIVE_THREADS", 2))
+        self.INTERACTIVE_PROCESSES = int(os.getenv("INTERACTIVE_PROCESSES", min(2, os.cpu_count() or 1)))
+        self.PROCESS_START_METHOD = os.getenv("PROCESS_START_METHOD", "spawn")
+        # Processes a single job may fan work out to (image recompression, rendering,
+        # split). 0 = one per CPU in the web process, and cpu_count divided by
+        # WORKER_PROCESSES + INTERACTIVE_PROCESSES in lane processes (1 = inline)
+        self.PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", 0))
+        # Tools sent to the process pool; None means "use Tool.cpu_bound"
+        self.PROCESS_POOL_TOOLS = _env_list("PROCESS_POOL_TOOLS")
+        # Jobs for these tools, or with inputs at/over either limit, use the batch lane
+        self.BATCH_TOOLS = _env_list("BATCH_TOOLS")  # None means "use Tool.lane"
+        self.BATCH_MIN_PAGES = int(os.getenv("BATCH_MIN_PAGES", 100))
+        self.BATCH_MIN_BYTES = int(os.getenv("BATCH_MIN_BYTES", 20 * 1024 * 1024))
+        # Upper bound on inputs per batch job (POST /api/jobs with batch=true)
+        self.BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 500))
+        # External tools (Ghostscript, qpdf, soffice): host-wide process caps,
+        # wall-clock timeout and optional address-space limit per process
+        self.EXTERNAL_MAX_PROCS = int(os.getenv("EXTERNAL_MAX_PROCS", os.cpu_count() or 1))
+        self.EXTERNAL_TOOL_LIMITS = os.getenv("EXTERNAL_TOOL_LIMITS", "gs=2,qpdf=4,soffice=2")
+        self.EXTERNAL_TIMEOUT = float(os.getenv("EXTERNAL_TIMEOUT", 300))
+        self.EXTERNAL_MEMORY_LIMIT_MB = int(os.getenv("EXTERNAL_MEMORY_LIMIT_MB", 0))  # 0 = no limit
+        # Long-lived headless LibreOffice instances per worker process (Word/PowerPoint -> PDF)
+        self.LIBREOFFICE_POOL_SIZE = int(os.getenv("LIBREOFFICE_POOL_SIZE", 2))
+        self.LIBREOFFICE_TIMEOUT = float(os.getenv("LIBREOFFICE_TIMEOUT", 120))
+        self.LIBREOFFICE_MAX_CONVERSIONS = int(os.getenv("LIBREOFFICE_MAX_CONVERSIONS", 200))
+        # Content-addressed cache of tool outputs (JOBS_DIR/.cache/results)
+        self.RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
+        self.RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+        self.RESULT_CACHE_EXCLUDE = _env_list("RESULT_CACHE_EXCLUDE") or []
+        # Rendered page images shared by pdf-to-images, pdf-to-pptx and previews
+        # (JOBS_DIR/.cache/pages), plus a per-process in-memory tier
+        self.PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
+        self.PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+        self.PAGE_CACHE_MEMORY_BYTES = int(os.getenv("PAGE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+        # Prepared signature images (JOBS_DIR/.cache/signatures); independent of PAGE_CACHE_ENABLED
+        self.SIGNATURE_CACHE_ENABLED = os.getenv("SIGNATURE_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
+        # Resolution of page thumbnails served by /api/previews
+        self.THUMBNAIL_DPI = int(os.getenv("THUMBNAIL_DPI", 36))
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-import concurrent.futures
-from typing import Callable, Any
+import multiprocessing
+from typing import Callable, Any, Dict, List
 
 import sentry_sdk
 from flask import Flask
 from itsdangerous import URLSafeSerializer
 
+from .tasks.scheduler import Lane
+from .tasks.sweeper import WorkspaceSweeper
+from .utils.files import input_cost
+
 try:
     import redis
     from rq import Queue
@@ -17,27 +21,124 @@ except Exception:  # pragma: no cover - optional in dev
 
 class TaskBackend:
     def __init__(self) -> None:
-        self.queue: Queue | None = None
-        self.executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self.queues: Dict[str, Queue] = {}
+        self.lanes: Dict[str, Lane] = {}
+        self.process_tools: set[str] | None = None
+        self.batch_tools: set[str] | None = None
+        self.batch_min_pages = 100
+        self.batch_min_bytes = 20 * 1024 * 1024
 
     def init_app(self, app: Flask) -> None:
+        configured = app.config.get("BATCH_TOOLS")
+        self.batch_tools = set(configured) if configured is not None else None
+        self.batch_min_pages = int(app.config.get("BATCH_MIN_PAGES", self.batch_min_pages))
+        self.batch_min_bytes = int(app.config.get("BATCH_MIN_BYTES", self.batch_min_bytes))
+
         use_rq = app.config.get("USE_RQ", True) and app.config.get("REDIS_URL")
         if use_rq and redis and Queue:
             rconn = redis.from_url(app.config["REDIS_URL"])  # type: ignore[arg-type]
-            self.queue = Queue("essential-tools", connection=rconn)
+            # Run dedicated `rq worker` pools per queue to give each lane its own budget
+            self.queues = {
+                "interactive": Queue("essential-tools", connection=rconn),
+                "batch": Queue("essential-tools-batch", connection=rconn),
+            }
         else:
-            # Fallback to threadpool for dev/testing
-            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+            # Fallback to in-process pools for dev/testing: threads for I/O-bound
+            # tools, worker processes for tools that would otherwise hold the GIL.
+            interactive_processes = int(app.config.get("INTERACTIVE_PROCESSES", 0) or 0)
+            batch_processes = int(app.config.get("WORKER_PROCESSES", 0) or 0)
+            mp_context = None
+            if interactive_processes or batch_processes:
+                mp_context = multiprocessing.get_context(app.config.get("PROCESS_START_METHOD") or None)
+            # Worker processes must use the same store, broker and cache as the web process
+            from .tasks.jobs import init_worker, worker_settings
 
-    def enqueue(self, func: Callable[..., Any], *args: Any, **kwargs: Any):
-        if self.queue:
-            return self.queue.enqueue(func, *args, **kwargs)
-        else:
-            # Simple async submit; returns a Future-like object
-            return self.executor.submit(func, *args, **kwargs)  # type: ignore[return-value]
+            # Lane processes split the CPUs for their own fan-out (PARALLEL_WORKERS=0),
+            # so concurrent jobs stay near one rasterizer per CPU instead of cpu²
+            settings = dict(worker_settings(app.config), PARALLEL_SHARE=interactive_processes + batch_processes)
+            if mp_context is not None:
+                # Without Redis, progress events from lane processes reach SSE streams through this queue
+                from .tasks import events
+
+                settings["EVENTS_CHANNEL"] = events.worker_channel(mp_context)
+            worker_args = (settings,)
+            self.lanes = {
+                "interactive": Lane(
+                    "interactive",
+                    threads=int(app.config.get("INTERACTIVE_THREADS", 2)),
+                    processes=interactive_processes,
+                    mp_context=mp_context,
+                    initializer=init_worker,
+                    initargs=worker_args,
+                ),
+                "batch": Lane(
+                    "batch",
+                    threads=int(app.config.get("WORKER_THREADS", 4)),
+                    processes=batch_processes,
+                    mp_context=mp_context,
+                    initializer=init_worker,
+                    initargs=worker_args,
+                ),
+            }
+            configured = app.config.get("PROCESS_POOL_TOOLS")
+            self.process_tools = set(configured) if configured is not None else None
+
+    def uses_process_pool(self, tool: str | None) -> bool:
+        if not tool:
+            return False
+        if self.process_tools is not None:
+            return tool in self.process_tools
+        from .models.tools import get as get_tool
+
+        spec = get_tool(tool)
+        return bool(spec and spec.cpu_bound)
+
+    def classify(self, tool: str | None, inputs: List[str] | None = None) -> str:
+        # Heavy tools always go to batch; otherwise decide by upload size
+        if tool:
+            if self.batch_tools is not None:
+                if tool in self.batch_tools:
+                    return "batch"
+            else:
+                from .models.tools import get as get_tool
+
+                spec = get_tool(tool)
+                if spec and spec.lane == "batch":
+                    return "batch"
+        if inputs:
+            size, pages = input_cost(inputs, max_bytes=self.batch_min_bytes, max_pages=self.batch_min_pages)
+            if size >= self.batch_min_bytes or pages >= self.batch_min_pages:
+                return "batch"
+        return "interactive"
+
+    def enqueue(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        tool: str | None = None,
+        inputs: List[str] | None = None,
+        on_error: Callable[[BaseException], Any] | None = None,
+        **kwargs: Any,
+    ):
+        lane = self.classify(tool, inputs)
+        if self.queues:
+            # Jobs whose RQ worker dies are failed later by the sweeper (STALE_JOB_MINUTES)
+            return self.queues[lane].enqueue(func, *args, **kwargs)
+        # Returns a Future-like object
+        return self.lanes[lane].submit(func, args, kwargs, use_process=self.uses_process_pool(tool), on_error=on_error)
+
+    def stats(self) -> Dict[str, Any]:
+        if self.queues:
+            return {name: {"queued": len(q)} for name, q in self.queues.items()}
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for lane in self.lanes.values():
+            lane.shutdown(wait=wait)
 
 
 task_backend = TaskBackend()
+sweeper = WorkspaceSweeper()
 signer: URLSafeSerializer | None = None
 
 
@@ -48,8 +149,16 @@ def init_extensions(app: Flask) -> None:
     if dsn:
         sentry_sdk.init(dsn=dsn, traces_sample_rate=0.1)
 
+    # Job store, progress events and result cache
+    from .tasks.jobs import init_worker, worker_settings
+
+    init_worker(worker_settings(app.config))
+
     # Task system
     task_backend.init_app(app)
 
+    # Workspace expiry, quota eviction and deferred deletion
+    sweeper.init_app(app)
+
     # Download link signer
     signer = URLSafeSerializer(app.config["SECRET_KEY"], salt="essential-tools-download")
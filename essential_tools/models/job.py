@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import json
 import os
 import time
 import uuid
 from dataclasses import dataclass, asdict, field
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+from .job_store import store_for
 
 
 STATUSES = ("queued", "running", "done", "error")
+ACTIVE_STATUSES = ("queued", "running")
+# Batch items get their own workspace under <job workspace>/items/<n>
+ITEMS_DIRNAME = "items"
 
 
 @dataclass
@@ -20,6 +24,8 @@ class Job:
     options: Dict[str, Any] = field(default_factory=dict)
     created_at: float = field(default_factory=lambda: time.time())
     finished_at: float | None = None
+    # Last stored change (status, progress, result); the sweeper's liveness signal
+    updated_at: float | None = None
     workspace_path: str | None = None
     result_manifest: Dict[str, Any] | None = None
     error_message: str | None = None
@@ -34,19 +40,55 @@ class Job:
         workspace = os.path.join(jobs_dir, job_id)
         os.makedirs(workspace, exist_ok=True)
         job = cls(id=job_id, tool=tool, options=options or {}, workspace_path=workspace)
-        job.save()
+        store_for(jobs_dir).create(job.to_dict())
         return job
 
     @classmethod
     def load(cls, jobs_dir: str, job_id: str) -> "Job":
-        jobfile = os.path.join(jobs_dir, job_id, "job.json")
-        with open(jobfile, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return cls(**data)
+        # Raises JobNotFound (a FileNotFoundError) for unknown ids
+        return cls(**store_for(jobs_dir).get(job_id))
 
-    def save(self) -> None:
+    @classmethod
+    def query(cls, jobs_dir: str, limit: int = 50, offset: int = 0, **filters: Any) -> List["Job"]:
+        return [cls(**data) for data in store_for(jobs_dir).list(limit=limit, offset=offset, **filters)]
+
+    @classmethod
+    def count(cls, jobs_dir: str, **filters: Any) -> int:
+        return store_for(jobs_dir).count(**filters)
+
+    @property
+    def jobs_dir(self) -> str:
+        """JOBS_DIR this job lives in (shared caches and metrics are kept there)."""
+        if not self.workspace_path:
+            raise RuntimeError("workspace_path not set")
+        head = os.path.dirname(self.workspace_path)
+        # Batch items ("<parent>-<n>") work in <jobs_dir>/<parent>/items/<n>
+        if "-" in self.id and os.path.basename(head) == ITEMS_DIRNAME:
+            return os.path.dirname(os.path.dirname(head))
+        return head
+
+    def _store(self):
         if not self.workspace_path:
             raise RuntimeError("workspace_path not set")
-        jobfile = os.path.join(self.workspace_path, "job.json")
-        with open(jobfile, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        return store_for(os.path.dirname(self.workspace_path))
+
+    def save(self) -> None:
+        self._store().save(self.to_dict())
+
+    def update(self, **fields: Any) -> bool:
+        """Set and store ``fields``; False if the job was deleted in the meantime."""
+        fields = dict(fields, updated_at=time.time())
+        for k, v in fields.items():
+            setattr(self, k, v)
+        return self._store().update(self.to_dict(), fields)
+
+    def advance_progress(self, progress: int) -> bool:
+        """Raise progress only while the stored job is still running.
+
+        Unlike ``update`` this never writes other fields, so it can't undo a
+        concurrent finish from another process.
+        """
+        if not self._store().advance_progress(self.id, progress):
+            return False
+        self.progress = progress
+        return True
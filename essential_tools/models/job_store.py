@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+BACKENDS = ("sqlite", "filesystem")
+
+_JSON_FIELDS = ("options", "result_manifest")
+_COLUMNS = (
+    "id",
+    "tool",
+    "status",
+    "progress",
+    "options",
+    "created_at",
+    "finished_at",
+    "updated_at",
+    "workspace_path",
+    "result_manifest",
+    "error_message",
+    "user_id",
+)
+_FILTERS = ("status", "tool", "user_id")
+
+
+class JobNotFound(FileNotFoundError):
+    pass
+
+
+class FilesystemJobStore:
+    """One ``job.json`` per workspace; listing walks ``jobs_dir``."""
+
+    def __init__(self, jobs_dir: str) -> None:
+        self.jobs_dir = jobs_dir
+        self._thread_lock = threading.Lock()
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id, "job.json")
+
+    @contextlib.contextmanager
+    def _locked(self, job_id: str):
+        # Writers from different worker processes take an flock() on a
+        # sibling file; without fcntl (Windows) this only serializes threads.
+        if fcntl is None:
+            with self._thread_lock:
+                yield
+            return
+        fd = os.open(self._path(job_id) + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise JobNotFound(job_id) from None
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        path = self._path(data["id"])
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        # Atomic on POSIX and Windows: pollers never see a half-written file
+        os.replace(tmp, path)
+
+    def save(self, data: Dict[str, Any]) -> None:
+        with self._locked(data["id"]):
+            self._write(data)
+
+    create = save
+
+    def update(self, data: Dict[str, Any], fields: Iterable[str]) -> bool:
+        """Rewrite an existing record; False (and nothing written) if it is gone."""
+        try:
+            with self._locked(data["id"]):
+                if not os.path.exists(self._path(data["id"])):
+                    return False
+                self._write(data)
+        except FileNotFoundError:
+            return False  # workspace deleted
+        return True
+
+    def advance_progress(self, job_id: str, progress: int) -> bool:
+        """Raise a running job's progress; never touches any other field."""
+        try:
+            with self._locked(job_id):
+                data = self.get(job_id)
+                if data.get("status") != "running" or progress <= (data.get("progress") or 0):
+                    return False
+                data["progress"] = progress
+                data["updated_at"] = time.time()
+                self._write(data)
+        except (JobNotFound, FileNotFoundError):
+            return False  # deleted; don't recreate the record
+        return True
+
+    def delete(self, job_id: str) -> None:
+        # The record lives inside the workspace and goes with it
+        pass
+
+    def _iter(self, filters: Dict[str, Any]):
+        try:
+            names = os.listdir(self.jobs_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            try:
+                data = self.get(name)
+            except (OSError, ValueError):
+                continue
+            if all(data.get(k) == v for k, v in filters.items()):
+                yield data
+
+    def list(self, limit: int = 50, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        rows = sorted(self._iter(_clean_filters(filters)), key=lambda d: d.get("created_at") or 0, reverse=True)
+        return rows[offset : offset + limit]
+
+    def count(self, **filters: Any) -> int:
+        return sum(1 for _ in self._iter(_clean_filters(filters)))
+
+    def counts(self) -> List[tuple]:
+        tally: Dict[tuple, int] = {}
+        for data in self._iter({}):
+            key = (data.get("tool"), data.get("status"))
+            tally[key] = tally.get(key, 0) + 1
+        return [(tool, status, n) for (tool, status), n in sorted(tally.items(), key=str)]
+
+
+class SQLiteJobStore:
+    """Jobs table in ``jobs_dir/jobs.sqlite3`` (WAL), one connection per thread."""
+
+    FILENAME = "jobs.sqlite3"
+
+    def __init__(self, jobs_dir: str) -> None:
+        self.jobs_dir = jobs_dir
+        self.path = os.path.join(jobs_dir, self.FILENAME)
+        self._local = threading.local()
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Never reuse a connection across fork()
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self) -> None:
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                options TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                updated_at REAL,
+                workspace_path TEXT,
+                result_manifest TEXT,
+                error_message TEXT,
+                user_id TEXT
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, created_at);
+            CREATE INDEX IF NOT EXISTS ix_jobs_tool ON jobs (tool, created_at);
+            CREATE INDEX IF NOT EXISTS ix_jobs_user ON jobs (user_id, created_at);
+            CREATE INDEX IF NOT EXISTS ix_jobs_created ON jobs (created_at);
+            """
+        )
+        columns = {row["name"] for row in self._conn().execute("PRAGMA table_info(jobs)")}
+        if "updated_at" not in columns:  # databases created before the column existed
+            self._conn().execute("ALTER TABLE jobs ADD COLUMN updated_at REAL")
+
+    @staticmethod
+    def _encode(key: str, value: Any) -> Any:
+        if key in _JSON_FIELDS and value is not None:
+            return json.dumps(value, separators=(",", ":"))
+        return value
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        for key in _JSON_FIELDS:
+            if data.get(key) is not None:
+                data[key] = json.loads(data[key])
+        return data
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFound(job_id)
+        return self._decode(row)
+
+    def create(self, data: Dict[str, Any]) -> None:
+        cols = ", ".join(_COLUMNS)
+        marks = ", ".join("?" for _ in _COLUMNS)
+        self._conn().execute(
+            f"INSERT INTO jobs ({cols}) VALUES ({marks})",
+            [self._encode(c, data.get(c)) for c in _COLUMNS],
+        )
+
+    def save(self, data: Dict[str, Any]) -> None:
+        cols = ", ".join(_COLUMNS)
+        marks = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "id")
+        self._conn().execute(
+            f"INSERT INTO jobs ({cols}) VALUES ({marks}) ON CONFLICT(id) DO UPDATE SET {updates}",
+            [self._encode(c, data.get(c)) for c in _COLUMNS],
+        )
+
+    def update(self, data: Dict[str, Any], fields: Iterable[str]) -> bool:
+        """Single-statement UPDATE of only the changed columns; False if the job is gone.
+
+        Never inserts: a worker finishing a deleted job must not bring it back.
+        """
+        fields = [f for f in fields if f in _COLUMNS and f != "id"]
+        if not fields:
+            return True
+        assignments = ", ".join(f"{f} = ?" for f in fields)
+        params = [self._encode(f, data.get(f)) for f in fields] + [data["id"]]
+        cur = self._conn().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", params)
+        return cur.rowcount > 0
+
+    def advance_progress(self, job_id: str, progress: int) -> bool:
+        """Raise a running job's progress; never touches any other field."""
+        cur = self._conn().execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ? AND status = 'running' AND progress < ?",
+            (progress, time.time(), job_id, progress),
+        )
+        return cur.rowcount > 0
+
+    def delete(self, job_id: str) -> None:
+        self._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> tuple[str, list]:
+        if not filters:
+            return "", []
+        clause = " AND ".join(f"{k} = ?" for k in filters)
+        return f" WHERE {clause}", list(filters.values())
+
+    def list(self, limit: int = 50, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        where, params = self._where(_clean_filters(filters))
+        rows = self._conn().execute(
+            f"SELECT * FROM jobs{where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [int(limit), int(offset)],
+        )
+        return [self._decode(r) for r in rows]
+
+    def count(self, **filters: Any) -> int:
+        where, params = self._where(_clean_filters(filters))
+        return self._conn().execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+    def counts(self) -> List[tuple]:
+        """(tool, status, n) for every combination present."""
+        return self._conn().execute("SELECT tool, status, COUNT(*) FROM jobs GROUP BY tool, status").fetchall()
+
+
+def _clean_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in filters.items() if k in _FILTERS and v is not None}
+
+
+_backend = os.getenv("JOB_STORE", "sqlite").lower()
+_stores: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def configure(backend: str) -> None:
+    global _backend
+    backend = (backend or "sqlite").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown job store: {backend}")
+    with _lock:
+        _backend = backend
+        _stores.clear()
+
+
+def store_for(jobs_dir: str):
+    key = os.path.abspath(jobs_dir)
+    store: Optional[Any] = _stores.get(key)
+    if store is None:
+        with _lock:
+            store = _stores.get(key)
+            if store is None:
+                store = SQLiteJobStore(key) if _backend == "sqlite" else FilesystemJobStore(key)
+                _stores[key] = store
+    return store
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...utils.metrics import instrument
 
 
 @dataclass(frozen=True)
@@ -11,12 +13,25 @@ class Tool:
     desc: str
     category: str
     processor: Optional[Callable] = None  # Callable[[Job, List[str]], Dict[str, Any]]
+    cpu_bound: bool = False  # holds the GIL for long stretches; prefer the process pool
+    lane: str = "interactive"  # "batch" for tools that are slow regardless of input size
+    cacheable: bool = True  # False for non-deterministic or sensitive outputs
+    batchable: bool = False  # processes one document at a time, so a batch fans out per upload
+    batch_shared: Tuple[str, ...] = ()  # upload extensions passed to every batch item (e.g. a signature)
+    # Pipeline hooks that work on an open fitz.Document instead of files:
+    # apply(job, doc, assets) -> doc transforms it, write_doc(job, doc) -> path saves it
+    apply: Optional[Callable] = None
+    write_doc: Optional[Callable] = None
+    # Output written through utils.files.streaming_zip; downloadable while the job runs
+    stream_file: Optional[str] = None
 
 
 _REGISTRY: Dict[str, Tool] = {}
 
 
 def register(tool: Tool) -> None:
+    if tool.processor:
+        tool = replace(tool, processor=instrument(tool.slug, tool.processor))
     _REGISTRY[tool.slug] = tool
 
 
@@ -28,6 +43,8 @@ def all_tools() -> List[Tool]:
     return list(_REGISTRY.values())
 
 
+_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
 # Implemented tools
 from . import merge as _merge  # noqa: E402
 from . import split as _split  # noqa: E402
@@ -51,6 +68,8 @@ register(
         desc="Combine multiple PDFs into one.",
         category="organize",
         processor=_merge.process,
+        apply=_merge.apply,
+        cpu_bound=True,
     )
 )
 
@@ -58,9 +77,12 @@ register(
     Tool(
         slug="split",
         title="Split PDF",
-        desc="Extract page ranges into new files.",
+        desc="Split by page ranges, every N pages or a maximum part size.",
         category="organize",
         processor=_split.process,
+        cpu_bound=True,
+        batchable=True,
+        stream_file=_split.ZIP_NAME,
     )
 )
 
@@ -71,6 +93,8 @@ register(
         desc="Rotate pages 90/180/270.",
         category="organize",
         processor=_rotate.process,
+        apply=_rotate.apply,
+        batchable=True,
     )
 )
 
@@ -81,6 +105,7 @@ register(
         desc="Reduce file size with presets.",
         category="optimize",
         processor=_compress.process,
+        batchable=True,
     )
 )
 
@@ -92,6 +117,9 @@ register(
         desc="Convert PDF to DOCX.",
         category="convert",
         processor=_pdf_to_word.process,
+        cpu_bound=True,
+        lane="batch",
+        batchable=True,
     )
 )
 
@@ -102,6 +130,8 @@ register(
         desc="Pages to slides.",
         category="convert",
         processor=_pdf_to_pptx.process,
+        cpu_bound=True,
+        batchable=True,
     )
 )
 
@@ -113,6 +143,8 @@ register(
         desc="DOC/DOCX to PDF.",
         category="convert",
         processor=_word_to_pdf.process,
+        lane="batch",
+        batchable=True,
     )
 )
 register(
@@ -122,15 +154,20 @@ register(
         desc="PPT/PPTX to PDF.",
         category="convert",
         processor=_pptx_to_pdf.process,
+        lane="batch",
+        batchable=True,
     )
 )
 register(
     Tool(
         slug="pdf-to-images",
         title="PDF -> Images",
-        desc="Export pages as PNGs (ZIP)",
+        desc="Export pages as PNG, JPEG or WebP (ZIP)",
         category="convert",
         processor=_pdf_to_images.process,
+        cpu_bound=True,
+        batchable=True,
+        stream_file=_pdf_to_images.ZIP_NAME,
     )
 )
 register(
@@ -149,6 +186,10 @@ register(
         desc="Place signature image onto PDF pages.",
         category="secure",
         processor=_sign.process,
+        apply=_sign.apply,
+        cpu_bound=True,
+        batchable=True,
+        batch_shared=_IMAGE_EXTS,
     )
 )
 register(
@@ -158,6 +199,10 @@ register(
         desc="Add image or text watermark.",
         category="edit",
         processor=_watermark.process,
+        apply=_watermark.apply,
+        cpu_bound=True,
+        batchable=True,
+        batch_shared=_IMAGE_EXTS,
     )
 )
 register(
@@ -167,6 +212,8 @@ register(
         desc="Convert HTML content into PDF.",
         category="convert",
         processor=_html_to_pdf.process,
+        cacheable=False,
+        batchable=True,
     )
 )
 register(Tool(slug="unlock", title="Unlock PDF", desc="Remove password (with key).", category="secure"))
@@ -177,5 +224,8 @@ register(
         desc="Password protect with AES-256.",
         category="secure",
         processor=_protect.process,
+        write_doc=_protect.write_doc,
+        cacheable=False,
+        batchable=True,
     )
 )
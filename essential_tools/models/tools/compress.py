@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import io
 import os
 import shutil
-import subprocess
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from pypdf import PdfReader, PdfWriter
 
+from ...utils import external, parallel
+
 
 def _which(cmd: str) -> str | None:
     return shutil.which(cmd)
@@ -25,7 +27,7 @@ def _qpdf_executable() -> str | None:
     return _which("qpdf")
 
 
-def _compress_with_gs(inp: str, out: str, quality: str) -> None:
+def _compress_with_gs(inp: str, out: str, quality: str, jobs_dir: str | None = None) -> None:
     # Map UI quality to Ghostscript presets
     preset_map = {
         "low": "/screen",
@@ -47,10 +49,10 @@ def _compress_with_gs(inp: str, out: str, quality: str) -> None:
         f"-sOutputFile={out}",
         inp,
     ]
-    subprocess.run(cmd, check=True)
+    external.run("gs", cmd, jobs_dir=jobs_dir)
 
 
-def _compress_with_qpdf(inp: str, out: str) -> None:
+def _compress_with_qpdf(inp: str, out: str, jobs_dir: str | None = None) -> None:
     exe = _qpdf_executable()
     if not exe:
         raise FileNotFoundError("qpdf executable not found")
@@ -63,7 +65,134 @@ def _compress_with_qpdf(inp: str, out: str) -> None:
         inp,
         out,
     ]
-    subprocess.run(cmd, check=True)
+    external.run("qpdf", cmd, jobs_dir=jobs_dir)
+
+
+# quality -> (target image DPI, JPEG quality); DPIs follow Ghostscript's presets
+MUPDF_PRESETS = {
+    "low": (72, 50),
+    "medium": (150, 70),
+    "high": (300, 85),
+}
+# Like Ghostscript, only downsample images noticeably above the target
+_DOWNSAMPLE_THRESHOLD = 1.5
+
+
+def _image_plan(doc) -> Dict[bytes, Tuple[List[int], float]]:
+    """Group image xrefs by stream content; each group keeps its highest effective DPI."""
+    import hashlib
+
+    dpi: Dict[int, float] = {}
+    smasks = set()
+    for page in doc:
+        for info in page.get_images(full=True):
+            xref, smask, width = info[0], info[1], info[2]
+            if smask:
+                smasks.add(smask)
+            try:
+                rects = page.get_image_rects(xref)
+            except Exception:
+                rects = []
+            best = dpi.get(xref, 0.0)
+            for r in rects:
+                if r.width > 0:
+                    best = max(best, width / (r.width / 72.0))
+            dpi[xref] = best
+    groups: Dict[bytes, Tuple[List[int], float]] = {}
+    for xref, effective in dpi.items():
+        # Soft masks are left alone; the re-encoded parent keeps its /SMask
+        if xref in smasks:
+            continue
+        digest = hashlib.sha1(doc.xref_stream_raw(xref)).digest()
+        xrefs, best = groups.get(digest, ([], 0.0))
+        xrefs.append(xref)
+        groups[digest] = (xrefs, max(best, effective))
+    return groups
+
+
+def _reencode(doc, xref: int, dpi: float, target_dpi: int, jpeg_quality: int):
+    import fitz  # type: ignore
+    import zlib
+    from PIL import Image  # type: ignore
+
+    # Stencil/bilevel images (usually CCITT/JBIG2 scans) and colour-key masks stay as they are
+    if doc.xref_get_key(xref, "ImageMask")[1] == "true" or doc.xref_get_key(xref, "BitsPerComponent")[1] == "1":
+        return None
+    if doc.xref_get_key(xref, "Mask")[0] == "array":
+        return None
+    raw_len = len(doc.xref_stream_raw(xref))
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    img = Image.frombytes("L" if pix.n == 1 else "RGB", (pix.width, pix.height), pix.samples)
+    if dpi > target_dpi * _DOWNSAMPLE_THRESHOLD:
+        scale = target_dpi / dpi
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=jpeg_quality, optimize=True)
+    kind, data = "jpeg", buf.getvalue()
+    # Few colours (line art, charts): lossless Flate is usually smaller and sharper
+    if img.getcolors(256) is not None:
+        flate = zlib.compress(img.tobytes(), 9)
+        if len(flate) <= len(data) * 1.5:
+            kind, data = "flate", flate
+    if len(data) >= raw_len * 0.9:
+        return None
+    return kind, data, img.width, img.height, img.mode
+
+
+def _recompress_images(path: str, items: List[Tuple[int, float]], target_dpi: int, jpeg_quality: int):
+    # Runs in a worker process; each worker opens the document once
+    import fitz  # type: ignore
+
+    out = []
+    with fitz.open(path) as doc:
+        for xref, dpi in items:
+            try:
+                out.append((xref, _reencode(doc, xref, dpi, target_dpi, jpeg_quality)))
+            except Exception:
+                out.append((xref, None))
+    return out
+
+
+def _compress_with_mupdf(inp: str, out: str, quality: str) -> None:
+    """Downsample and re-encode images in-process, then save with garbage collection.
+
+    Identical image streams are recompressed once; ``garbage=4`` then merges
+    the duplicates in the output.
+    """
+    import fitz  # type: ignore
+
+    target_dpi, jpeg_quality = MUPDF_PRESETS.get(str(quality).lower(), MUPDF_PRESETS["medium"])
+    doc = fitz.open(inp)
+    try:
+        groups = list(_image_plan(doc).values())
+        items = [(xrefs[0], dpi) for xrefs, dpi in groups]
+        members = {xrefs[0]: xrefs for xrefs, _ in groups}
+        tasks = [
+            (inp, [items[i] for i in shard], target_dpi, jpeg_quality)
+            for shard in parallel.shards(len(items), parallel.workers())
+        ]
+        for results in parallel.run_sharded(_recompress_images, tasks):
+            for rep, payload in results:
+                if payload is None:
+                    continue
+                kind, data, width, height, mode = payload
+                for xref in members[rep]:
+                    doc.update_stream(xref, data, compress=0)
+                    doc.xref_set_key(xref, "Filter", "/DCTDecode" if kind == "jpeg" else "/FlateDecode")
+                    doc.xref_set_key(xref, "Width", str(width))
+                    doc.xref_set_key(xref, "Height", str(height))
+                    doc.xref_set_key(xref, "ColorSpace", "/DeviceGray" if mode == "L" else "/DeviceRGB")
+                    doc.xref_set_key(xref, "BitsPerComponent", "8")
+                    doc.xref_set_key(xref, "DecodeParms", "null")
+                    doc.xref_set_key(xref, "Decode", "null")
+        doc.save(out, garbage=4, deflate=True, use_objstms=1)
+    finally:
+        doc.close()
 
 
 def _rewrite_with_pypdf(inp: str, out: str) -> None:
@@ -82,12 +211,13 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     quality = job.options.get("quality", "medium")
     out_name = f"{job.id}_compressed.pdf"
     out_path = os.path.join(job.workspace_path, out_name)
+    jobs_dir = job.jobs_dir
 
-    # Try Ghostscript first, then qpdf, then a simple rewrite fallback.
+    # Try Ghostscript first, then qpdf, then PyMuPDF, then a simple rewrite fallback.
     tried = []
     try:
         if _gs_executable():
-            _compress_with_gs(input_pdf, out_path, quality)
+            _compress_with_gs(input_pdf, out_path, quality, jobs_dir)
             return {"files": [out_path]}
         tried.append("ghostscript")
     except Exception:
@@ -95,12 +225,19 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
 
     try:
         if _qpdf_executable():
-            _compress_with_qpdf(input_pdf, out_path)
+            _compress_with_qpdf(input_pdf, out_path, jobs_dir)
             return {"files": [out_path]}
         tried.append("qpdf")
     except Exception:
         tried.append("qpdf")
 
+    # No external binary: recompress images with PyMuPDF
+    try:
+        _compress_with_mupdf(input_pdf, out_path, quality)
+        return {"files": [out_path]}
+    except Exception:
+        tried.append("pymupdf")
+
     # Fallback: rewrite with pypdf (minimal size change)
     _rewrite_with_pypdf(input_pdf, out_path)
     return {"files": [out_path]}
@@ -5,6 +5,8 @@ import os
 from html.parser import HTMLParser
 from typing import Dict, List, Tuple
 
+from ...utils.text_layout import wrap, write_pages
+
 _WEASY_AVAILABLE = None  # lazy-checked at runtime
 
 
@@ -63,27 +65,6 @@ def _html_to_text(content: str) -> str:
     return "\n".join(line.strip() for line in parser.get_text().splitlines())
 
 
-def _wrap_lines(text: str, max_width: float, font: str, size: float) -> List[str]:
-    import fitz  # type: ignore
-
-    words = text.split()
-    if not words:
-        return []
-    lines: List[str] = []
-    line = ""
-    for word in words:
-        candidate = (line + " " + word) if line else word
-        if fitz.get_text_length(candidate, fontname=font, fontsize=size) <= max_width:
-            line = candidate
-        else:
-            if line:
-                lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-    return lines
-
-
 def _render_with_fitz(content: str, page_size: str, mode: str, out_path: str) -> None:
     import fitz  # type: ignore
 
@@ -107,7 +88,7 @@ def _render_with_fitz(content: str, page_size: str, mode: str, out_path: str) ->
     total_lines = 0
     for para in paragraphs:
         para = para.rstrip()
-        lines = _wrap_lines(para if para else " ", max_width, font, size) or [""]
+        lines = wrap(para, max_width, font, size) or [""]
         wrapped_paragraphs.append(lines)
         total_lines += len(lines) + 1  # include spacing
 
@@ -115,18 +96,7 @@ def _render_with_fitz(content: str, page_size: str, mode: str, out_path: str) ->
         height = max(height, margin * 2 + line_height * total_lines)
 
     doc = fitz.open()
-    page = doc.new_page(width=width, height=height)
-    y = margin
-
-    for lines in wrapped_paragraphs:
-        for line in lines:
-            if y + line_height > height - margin:
-                page = doc.new_page(width=width, height=height)
-                y = margin
-            page.insert_text((margin, y), line, fontname=font, fontsize=size)
-            y += line_height
-        y += line_height * 0.5
-
+    write_pages(doc, wrapped_paragraphs, width, height, margin, font, size, line_height, line_height * 0.5)
     doc.save(out_path)
     doc.close()
 
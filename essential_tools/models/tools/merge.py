@@ -4,18 +4,58 @@ import os
 from typing import Any, Dict, List
 from pypdf import PdfReader, PdfWriter
 
+ENGINES = ("pymupdf", "pypdf")
 
-def process(job, upload_paths: List[str]) -> Dict[str, Any]:
-    
-    if len(upload_paths) < 2:
-        raise ValueError("Provide at least two PDFs to merge")
+
+def _merge_with_pypdf(paths: List[str], out_path: str) -> None:
     writer = PdfWriter()
-    for path in upload_paths:
+    for path in paths:
         reader = PdfReader(path)
         for page in reader.pages:
             writer.add_page(page)
-    out_name = f"{job.id}_merged.pdf"
-    out_path = os.path.join(job.workspace_path, out_name)
     with open(out_path, "wb") as f:
         writer.write(f)
+
+
+def _merge_with_mupdf(paths: List[str], out_path: str) -> None:
+    """Append each input with insert_pdf, closing it straight away.
+
+    ``garbage=4`` merges identical objects on save, so a letterhead image or
+    font repeated in every input is stored once in the output.
+    """
+    import fitz  # type: ignore
+
+    doc = fitz.open()
+    try:
+        for path in paths:
+            with fitz.open(path) as src:
+                doc.insert_pdf(src)
+        doc.save(out_path, garbage=4, deflate=True, use_objstms=1)
+    finally:
+        doc.close()
+
+
+def process(job, upload_paths: List[str]) -> Dict[str, Any]:
+    if len(upload_paths) < 2:
+        raise ValueError("Provide at least two PDFs to merge")
+    engine = str(job.options.get("engine") or "pymupdf").lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown merge engine: {engine}")
+    out_name = f"{job.id}_merged.pdf"
+    out_path = os.path.join(job.workspace_path, out_name)
+    if engine == "pypdf":
+        _merge_with_pypdf(upload_paths, out_path)
+    else:
+        _merge_with_mupdf(upload_paths, out_path)
     return {"files": [out_path]}
+
+
+def apply(job, doc, assets: List[str]):
+    """Pipeline step: append every extra PDF to the open document."""
+    import fitz  # type: ignore
+
+    for path in assets:
+        if os.path.splitext(path)[1].lower() == ".pdf":
+            with fitz.open(path) as src:
+                doc.insert_pdf(src)
+    return doc
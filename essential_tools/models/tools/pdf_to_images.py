@@ -1,9 +1,30 @@
 from __future__ import annotations
 
 import os
-import io
 import zipfile
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+
+from ...utils import page_cache, parallel
+from ...utils.page_cache import page_key
+from ...utils.result_cache import file_sha256
+from ...utils.raster import RenderSpec, parse_spec, render_page, resolve_spec
+from ...utils.files import streaming_zip
+
+
+# Below this many pages per worker, process start-up costs more than it saves
+_MIN_PAGES_PER_WORKER = 4
+# Shards stay small so pages reach the archive (and a streaming download) early
+_MAX_PAGES_PER_SHARD = 16
+
+ZIP_NAME = "images.zip"
+
+
+def _render_pages(src: str, indices: List[int], spec: RenderSpec) -> List[Tuple[str, bytes]]:
+    # Runs in a worker process; opens the document once for its whole shard
+    import fitz  # PyMuPDF
+
+    with fitz.open(src) as doc:
+        return [render_page(doc[i], spec) for i in indices]
 
 
 def process(job, upload_paths: List[str]) -> Dict[str, Any]:
@@ -16,28 +37,43 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
         raise RuntimeError("PyMuPDF is required for PDF rendering") from e
 
     src = upload_paths[0]
-    dpi = int(job.options.get("dpi", 150))
-    zoom = max(1.0, dpi / 72.0)
-    doc = fitz.open(src)
-    total = doc.page_count
+    spec = parse_spec(job.options)
+    # Pages already in the render cache are not sent to the workers
+    cache = page_cache.cache_for(job.jobs_dir)
+    keys: List[str] = []
+    with fitz.open(src) as doc:
+        total = doc.page_count
+        if cache:
+            doc_hash = file_sha256(src)
+            # "auto" pages are keyed by the format they resolve to
+            specs = [resolve_spec(page, spec) for page in doc] if spec.format == "auto" else [spec] * total
+            keys = [page_key(doc_hash, i, page_spec) for i, page_spec in enumerate(specs)]
     if total == 0:
         raise ValueError("Empty PDF")
+    todo = [i for i in range(total) if not (cache and cache.contains(keys[i]))]
 
-    img_paths: list[str] = []
-    for i, page in enumerate(doc, start=1):
-        mat = fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        name = f"page_{i:03d}.png"
-        out_path = os.path.join(job.workspace_path, name)
-        pix.save(out_path)
-        img_paths.append(out_path)
-
-    # Bundle into a zip archive
-    zip_name = "images.zip"
-    zip_path = os.path.join(job.workspace_path, zip_name)
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for p in img_paths:
-            zf.write(p, arcname=os.path.basename(p))
+    per_shard = -(-len(todo) // parallel.workers())
+    per_shard = max(_MIN_PAGES_PER_WORKER, min(_MAX_PAGES_PER_SHARD, per_shard))
+    shards = parallel.shards(len(todo), -(-len(todo) // per_shard))
+    tasks = [(src, todo[r.start : r.stop], spec) for r in shards]
+    rendered = (page for pages in parallel.imap_sharded(_render_pages, tasks) for page in pages)
+    pending = set(todo)
 
-    return {"files": [zip_path]}
+    # PNG/JPEG/WebP are already compressed: store pages as-is, straight from the renderer
+    zip_path = os.path.join(job.workspace_path, ZIP_NAME)
+    with streaming_zip(zip_path, compression=zipfile.ZIP_STORED) as zf:
+        for i in range(total):
+            if i in pending:
+                page = next(rendered)
+                if cache:
+                    cache.put(keys[i], *page)
+            else:
+                page = cache.get(keys[i])
+                if page is None:
+                    # Evicted since the lookup above
+                    page = _render_pages(src, [i], spec)[0]
+                    cache.put(keys[i], *page)
+            ext, data = page
+            zf.writestr(f"page_{i + 1:03d}.{ext}", data)
 
+    return {"files": [zip_path]}
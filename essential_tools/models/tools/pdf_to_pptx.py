@@ -4,6 +4,11 @@ import io
 import os
 from typing import Any, Dict, List
 
+from ...utils import page_cache
+from ...utils.page_cache import page_key
+from ...utils.raster import parse_spec, render_page, resolve_spec
+from ...utils.result_cache import file_sha256
+
 
 def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     if len(upload_paths) != 1:
@@ -25,9 +30,9 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     out_name = f"{job.id}.pptx"
     out_path = os.path.join(job.workspace_path, out_name)
 
-    # Render pages to images using PyMuPDF (no external binaries)
-    dpi = int(job.options.get("dpi", 150))
-    zoom = max(1.0, dpi / 72.0)
+    # Render pages to images using PyMuPDF (no external binaries);
+    # python-pptx only embeds PNG/JPEG, and "auto" keeps scans from bloating the deck
+    spec = parse_spec(job.options, default_format="auto", formats=("png", "jpeg"))
     doc = fitz.open(input_pdf)
     if doc.page_count == 0:
         raise ValueError("No pages found in PDF")
@@ -37,10 +42,18 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     slide_w = prs.slide_width
     slide_h = prs.slide_height
 
-    for page in doc:
-        mat = fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        buf = io.BytesIO(pix.tobytes("png"))
+    # Pages rendered earlier (e.g. by pdf-to-images on the same file) come from the render cache
+    cache = page_cache.cache_for(job.jobs_dir)
+    doc_hash = file_sha256(input_pdf) if cache else ""
+    for i, page in enumerate(doc):
+        page_spec = resolve_spec(page, spec)
+        key = page_key(doc_hash, i, page_spec) if cache else ""
+        hit = cache.get(key) if cache else None
+        if hit is None:
+            hit = render_page(page, page_spec)
+            if cache:
+                cache.put(key, *hit)
+        buf = io.BytesIO(hit[1])
         slide = prs.slides.add_slide(blank_layout)
         slide.shapes.add_picture(buf, Emu(0), Emu(0), width=slide_w, height=slide_h)
 
@@ -1,31 +1,18 @@
 from __future__ import annotations
 
 import os
-import shutil
-import subprocess
 from typing import Any, Dict, List
 
-
-def _which(cmd: str) -> str | None:
-    return shutil.which(cmd)
+from ...utils import libreoffice
 
 
 def _libreoffice_exe() -> str | None:
-    for name in ("soffice", "soffice.bin"):
-        p = _which(name)
-        if p:
-            return p
-    return None
+    return libreoffice.find_executable()
 
 
-def _convert_with_libreoffice(inp: str, out_dir: str) -> str:
-    exe = _libreoffice_exe()
-    if not exe:
-        raise FileNotFoundError("LibreOffice (soffice) not found")
-    cmd = [exe, "--headless", "--nologo", "--convert-to", "pdf", "--outdir", out_dir, inp]
-    subprocess.run(cmd, check=True)
-    base = os.path.splitext(os.path.basename(inp))[0] + ".pdf"
-    return os.path.join(out_dir, base)
+def _convert_with_libreoffice(inp: str, out_dir: str, jobs_dir: str | None = None) -> str:
+    # Runs on the shared pool of long-lived LibreOffice instances
+    return libreoffice.convert(inp, out_dir, jobs_dir=jobs_dir)
 
 
 EMU_PER_PT = 12700.0
@@ -103,7 +90,7 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     # Try LibreOffice first when available (best fidelity for PPT/PPTX)
     try:
         if _libreoffice_exe():
-            produced = _convert_with_libreoffice(src, job.workspace_path)
+            produced = _convert_with_libreoffice(src, job.workspace_path, job.jobs_dir)
             if os.path.abspath(produced) != os.path.abspath(out_path):
                 os.replace(produced, out_path)
             return {"files": [out_path]}
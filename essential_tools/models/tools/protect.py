@@ -10,14 +10,23 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
     if len(upload_paths) != 1:
         raise ValueError("Upload exactly one PDF to protect")
 
+    doc = fitz.open(upload_paths[0])
+    try:
+        out_path = write_doc(job, doc)
+    finally:
+        doc.close()
+
+    return {"files": [out_path]}
+
+
+def write_doc(job, doc) -> str:
+    """Save ``doc`` encrypted; also the final step of a pipeline."""
     password = (job.options.get("password") or "").strip()
     if not password:
         raise ValueError("Password is required")
 
     owner_password = (job.options.get("owner_password") or password).strip() or password
 
-    src = upload_paths[0]
-    doc = fitz.open(src)
     out_name = f"{job.id}_protected.pdf"
     out_path = os.path.join(job.workspace_path, out_name)
 
@@ -39,15 +48,11 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
             if hasattr(fitz, attr):
                 permissions |= getattr(fitz, attr)
 
-    try:
-        doc.save(
-            out_path,
-            encryption=fitz.PDF_ENCRYPT_AES_256,
-            owner_pw=owner_password,
-            user_pw=password,
-            permissions=permissions,
-        )
-    finally:
-        doc.close()
-
-    return {"files": [out_path]}
+    doc.save(
+        out_path,
+        encryption=fitz.PDF_ENCRYPT_AES_256,
+        owner_pw=owner_password,
+        user_pw=password,
+        permissions=permissions,
+    )
+    return out_path
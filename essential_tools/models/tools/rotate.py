@@ -2,26 +2,33 @@ from __future__ import annotations
 
 import os
 from typing import Any, Dict, List
-from pypdf import PdfReader, PdfWriter
+
+from ...utils.files import edit_pdf
+
+
+def _targets(scope, total: int) -> set[int]:
+    # "all" or comma-separated 1-based page numbers
+    if scope == "all":
+        return set(range(1, total + 1))
+    return set(int(x) for x in str(scope).split(",") if x.strip().isdigit())
 
 
 def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     if len(upload_paths) != 1:
         raise ValueError("Upload exactly one PDF to rotate")
-    degrees = int(job.options.get("degrees", 90))
-    scope = job.options.get("scope", "all")  # "all" or comma-separated pages
-    reader = PdfReader(upload_paths[0])
-    writer = PdfWriter()
-    if scope == "all":
-        targets = set(range(1, len(reader.pages) + 1))
-    else:
-        targets = set(int(x) for x in str(scope).split(",") if x.strip().isdigit())
-    for i, page in enumerate(reader.pages, start=1):
-        if i in targets:
-            page.rotate(degrees)
-        writer.add_page(page)
     out_name = f"{job.id}_rotated.pdf"
     out_path = os.path.join(job.workspace_path, out_name)
-    with open(out_path, "wb") as f:
-        writer.write(f)
+    # Incremental: only the rotated page dictionaries are appended
+    with edit_pdf(upload_paths[0], out_path, bool(job.options.get("incremental"))) as doc:
+        apply(job, doc, [])
     return {"files": [out_path]}
+
+
+def apply(job, doc, assets: List[str]):
+    """Pipeline step: rotate pages of the open document."""
+    degrees = int(job.options.get("degrees", 90))
+    for i in sorted(_targets(job.options.get("scope", "all"), doc.page_count)):
+        if i <= doc.page_count:
+            page = doc[i - 1]
+            page.set_rotation((page.rotation + degrees) % 360)
+    return doc
@@ -1,30 +1,84 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import os
 from typing import Dict, List
 
-from PIL import Image  # type: ignore
+from PIL import Image, ImageChops  # type: ignore
+
+from ...utils import page_cache
+from ...utils.files import edit_pdf
+from ...utils.result_cache import file_sha256
 
 
 ALIGN_MAP = {"left": 0.15, "center": 0.5, "right": 0.85}
 
 
-def _prepare_signature(path: str, remove_bg: bool, threshold: int = 220):
+def _auto_threshold(levels: "Image.Image") -> int:
+    # Otsu's threshold on the darkest-channel histogram: splits ink from paper
+    hist = levels.histogram()
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best, best_var = 0, -1.0
+    for i, h in enumerate(hist):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        var = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if var > best_var:
+            best, best_var = i, var
+    # Never treat mid-greys as paper, even on a low-contrast photo
+    return min(max(best + 1, 128), 250)
+
+
+def _prepare_signature(path: str, remove_bg: bool, threshold: int | str = 220):
     img = Image.open(path).convert("RGBA")
     if remove_bg:
-        pixels = []
-        for r, g, b, a in img.getdata():
-            if r >= threshold and g >= threshold and b >= threshold:
-                pixels.append((r, g, b, 0))
-            else:
-                pixels.append((r, g, b, a))
-        img.putdata(pixels)
+        # Paper is where every channel is bright, i.e. the darkest channel is
+        r, g, b, a = img.split()
+        levels = ImageChops.darker(ImageChops.darker(r, g), b)
+        cutoff = _auto_threshold(levels) if threshold == "auto" else int(threshold)
+        keep = levels.point([255 if v < cutoff else 0 for v in range(256)])
+        img.putalpha(ImageChops.multiply(a, keep))
     buf = io.BytesIO()
     img.save(buf, format="PNG")
     return buf.getvalue(), img.width, img.height
 
 
+def _cached_signature(job, path: str, remove_bg: bool, threshold: int | str):
+    # Prepared once per (image, options) and shared across jobs
+    cache = page_cache.cache_for(job.jobs_dir, "signatures")
+    if cache is None:
+        return _prepare_signature(path, remove_bg, threshold)
+    key = hashlib.sha256(f"{file_sha256(path)}\0{remove_bg}\0{threshold}".encode()).hexdigest()
+    hit = cache.get(key)
+    if hit is not None:
+        width, height = Image.open(io.BytesIO(hit[1])).size
+        return hit[1], width, height
+    stream, width, height = _prepare_signature(path, remove_bg, threshold)
+    cache.put(key, "png", stream)
+    return stream, width, height
+
+
+def _parse_threshold(raw) -> int | str:
+    if raw is None or raw == "":
+        return 220
+    if str(raw).lower() == "auto":
+        return "auto"
+    try:
+        return min(max(int(raw), 1), 255)
+    except (TypeError, ValueError):
+        raise ValueError("Background threshold must be 1-255 or 'auto'") from None
+
+
 def _select_pages(total: int, mode: str) -> List[int]:
     if total == 0:
         return []
@@ -37,8 +91,6 @@ def _select_pages(total: int, mode: str) -> List[int]:
 
 
 def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
-    import fitz  # type: ignore
-
     pdf_path = None
     sig_path = None
     for path in upload_paths:
@@ -51,6 +103,25 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
     if not pdf_path or not sig_path:
         raise ValueError("Upload both PDF and signature image")
 
+    out_name = f"{job.id}_signed.pdf"
+    out_path = os.path.join(job.workspace_path, out_name)
+    with edit_pdf(pdf_path, out_path, bool(job.options.get("incremental"))) as doc:
+        apply(job, doc, [sig_path])
+
+    return {"files": [out_path]}
+
+
+def apply(job, doc, assets: List[str]):
+    """Stamp the signature image onto the open document; also a pipeline step."""
+    import fitz  # type: ignore
+
+    sig_path = None
+    for path in assets:
+        if os.path.splitext(path)[1].lower() in {".png", ".jpg", ".jpeg", ".bmp"}:
+            sig_path = path
+    if not sig_path:
+        raise ValueError("Upload a signature image")
+
     remove_bg = bool(job.options.get("remove_bg"))
     placement = job.options.get("placement", "all")
     align = job.options.get("align", "right").lower()
@@ -58,14 +129,15 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
     scale = float(job.options.get("scale", 0.3))
     scale = min(max(scale, 0.1), 0.6)
 
-    sig_stream, sig_w_px, sig_h_px = _prepare_signature(sig_path, remove_bg)
+    threshold = _parse_threshold(job.options.get("bg_threshold"))
+    sig_stream, sig_w_px, sig_h_px = _cached_signature(job, sig_path, remove_bg, threshold)
 
-    doc = fitz.open(pdf_path)
     target_pages = _select_pages(doc.page_count, placement)
     if not target_pages:
         raise ValueError("No pages selected for signing")
 
     margin = 36  # half inch
+    sig_xref = 0
 
     for idx in target_pages:
         page = doc[idx]
@@ -87,11 +159,10 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
         y1 = rect.y1 - margin
         y0 = y1 - sig_height
 
-        page.insert_image(fitz.Rect(x0, y0, x1, y1), stream=sig_stream, overlay=True)
-
-    out_name = f"{job.id}_signed.pdf"
-    out_path = os.path.join(job.workspace_path, out_name)
-    doc.save(out_path)
-    doc.close()
-
-    return {"files": [out_path]}
+        box = fitz.Rect(x0, y0, x1, y1)
+        # Embed once; later pages reference the same image XObject
+        if sig_xref:
+            page.insert_image(box, xref=sig_xref, overlay=True)
+        else:
+            sig_xref = page.insert_image(box, stream=sig_stream, overlay=True)
+    return doc
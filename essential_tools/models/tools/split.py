@@ -1,8 +1,24 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List
-from pypdf import PdfReader, PdfWriter
+import re
+import zipfile
+from typing import Any, Dict, List, Set, Tuple
+
+from ...utils import parallel
+from ...utils.files import streaming_zip
+
+MODES = ("ranges", "every", "size")
+ZIP_NAME = "split.zip"
+# Small shards so parts reach the archive (and a streaming download) early
+_MAX_PARTS_PER_SHARD = 8
+# Rough cost of a part's header, catalog, page tree and xref table
+_PART_OVERHEAD = 1024
+# "n 0 obj ... endobj", stream keywords and the xref entry around each object
+_OBJECT_OVERHEAD = 60
+_REF = re.compile(r"\b(\d+) 0 R\b")
+# Back-references up the page tree (pages, annotations, form fields)
+_PARENT = re.compile(r"/Parent\s*\d+ 0 R")
 
 
 def _parse_ranges(expr: str, total_pages: int):
@@ -25,26 +41,139 @@ def _parse_ranges(expr: str, total_pages: int):
             yield start, end
 
 
+def _every(n: int, total_pages: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + n - 1, total_pages)) for start in range(1, total_pages + 1, n)]
+
+
+def _object_size(doc, xref: int) -> int:
+    """Serialized size of object ``xref``: its dictionary plus any stream data."""
+    size = _OBJECT_OVERHEAD + len(doc.xref_object(xref, compressed=True))
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == "xref":
+        value = doc.xref_object(int(value.split()[0])).strip()
+    return size + (int(value) if value.isdigit() else 0)
+
+
+def _page_objects(doc, page) -> Set[int]:
+    """Xrefs a copy of ``page`` carries: every object reachable from it.
+
+    That takes in fonts with their descriptors and embedded font files,
+    images with their soft masks, forms and annotations. Links to other
+    pages and the page tree itself are not followed.
+    """
+    objects: Set[int] = set()
+    todo = [page.xref]
+    limit = doc.xref_length()
+    while todo:
+        xref = todo.pop()
+        if xref in objects:
+            continue
+        objects.add(xref)
+        source = _PARENT.sub("", doc.xref_object(xref, compressed=True))
+        for match in _REF.finditer(source):
+            ref = int(match.group(1))
+            if 0 < ref < limit and ref not in objects and doc.xref_get_key(ref, "Type") != ("name", "/Page"):
+                todo.append(ref)
+    return objects
+
+
+def _by_size(doc, max_bytes: int) -> List[Tuple[int, int]]:
+    """Greedy page ranges whose estimated size stays under ``max_bytes``.
+
+    A page costs every object it references (see _page_objects); objects
+    shared with earlier pages of the same part are counted once, since the
+    part stores them once. A single page over the limit gets a part of its
+    own.
+    """
+    ranges: List[Tuple[int, int]] = []
+    start, size = 1, _PART_OVERHEAD
+    seen: Set[int] = set()
+    sizes: Dict[int, int] = {}
+
+    def cost(xrefs: Set[int]) -> int:
+        for x in xrefs - sizes.keys():
+            sizes[x] = _object_size(doc, x)
+        return sum(sizes[x] for x in xrefs)
+
+    for number, page in enumerate(doc, start=1):
+        xrefs = _page_objects(doc, page)
+        new = xrefs - seen
+        if number > start and size + cost(new) > max_bytes:
+            ranges.append((start, number - 1))
+            start, size, seen = number, _PART_OVERHEAD, set()
+            new = xrefs
+        seen |= new
+        size += cost(new)
+    ranges.append((start, doc.page_count))
+    return ranges
+
+
+def _archived(options: Dict[str, Any]) -> bool:
+    # Must match the split page, which offers the streamed ZIP on the same rule
+    mode = str(options.get("mode") or "ranges").lower()
+    if mode != "ranges":
+        return True
+    return len([p for p in str(options.get("ranges") or "").split(",") if p.strip()]) > 1
+
+
+def _plan(options: Dict[str, Any], doc) -> List[Tuple[int, int]]:
+    mode = str(options.get("mode") or "ranges").lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown split mode: {mode}")
+    if mode == "every":
+        n = int(options.get("pages") or 0)
+        if n < 1:
+            raise ValueError("Pages per part must be at least 1")
+        return _every(n, doc.page_count)
+    if mode == "size":
+        max_bytes = int(options.get("max_bytes") or 0)
+        if max_bytes < 1:
+            raise ValueError("Maximum part size must be positive")
+        return _by_size(doc, max_bytes)
+    return list(_parse_ranges(options.get("ranges") or "1-end", doc.page_count))
+
+
+def _write_parts(src: str, out_dir: str, parts: List[Tuple[str, int, int]]) -> List[str]:
+    # Runs in a worker process; opens the source once for its whole shard
+    import fitz  # type: ignore
+
+    paths = []
+    with fitz.open(src) as doc:
+        for name, start, end in parts:
+            out = fitz.open()
+            try:
+                out.insert_pdf(doc, from_page=start - 1, to_page=end - 1)
+                path = os.path.join(out_dir, name)
+                out.save(path, garbage=3, deflate=True)
+            finally:
+                out.close()
+            paths.append(path)
+    return paths
+
+
 def process(job, upload_paths: List[str]) -> Dict[str, Any]:
     if len(upload_paths) != 1:
         raise ValueError("Upload exactly one PDF to split")
-    reader = PdfReader(upload_paths[0])
-    ranges = job.options.get("ranges") or "1-end"
-    outputs: list[str] = []
-    ranges_list = list(_parse_ranges(ranges, len(reader.pages)))
+    import fitz  # type: ignore
+
+    src = upload_paths[0]
+    with fitz.open(src) as doc:
+        ranges_list = _plan(job.options, doc)
     if not ranges_list:
         raise ValueError("Invalid ranges")
-    multi = len(ranges_list) > 1
-    for idx, (start, end) in enumerate(ranges_list, start=1):
-        writer = PdfWriter()
-        for i in range(start - 1, end):
-            writer.add_page(reader.pages[i])
-        if multi:
-            out_name = f"splited_part{idx}.pdf"
-        else:
-            out_name = "splited.pdf"
-        out_path = os.path.join(job.workspace_path, out_name)
-        with open(out_path, "wb") as f:
-            writer.write(f)
-        outputs.append(out_path)
-    return {"files": outputs}
+    if not _archived(job.options):
+        start, end = ranges_list[0]
+        return {"files": _write_parts(src, job.workspace_path, [("splited.pdf", start, end)])}
+
+    parts = [(f"splited_part{idx}.pdf", start, end) for idx, (start, end) in enumerate(ranges_list, start=1)]
+    per_shard = max(1, min(_MAX_PARTS_PER_SHARD, -(-len(parts) // parallel.workers())))
+    shards = parallel.shards(len(parts), -(-len(parts) // per_shard))
+    tasks = [(src, job.workspace_path, parts[r.start : r.stop]) for r in shards]
+    # Parts are already deflated: store them as-is
+    zip_path = os.path.join(job.workspace_path, ZIP_NAME)
+    with streaming_zip(zip_path, compression=zipfile.ZIP_STORED) as zf:
+        for paths in parallel.imap_sharded(_write_parts, tasks):
+            for path in paths:
+                zf.write(path, os.path.basename(path))
+                os.remove(path)
+    return {"files": [zip_path]}
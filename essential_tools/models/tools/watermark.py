@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import io
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from PIL import Image  # type: ignore
 
+from ...utils.files import edit_pdf
+
 
 FONT_MAP = {
     "Helvetica": {
@@ -79,7 +81,17 @@ def _draw_text(page, text: str, font: str, size: float, style: str, bold: bool,
         page.draw_line((x, y_line), (x + text_width, y_line), color=color, width=1)
 
 
-def _apply_image(page, stream: bytes, source_size: tuple[int, int], style: str):
+def _insert(page, box, stream: bytes, xref: int) -> int:
+    # After the first placement the embedded XObject is referenced by xref;
+    # passing the stream again would make PyMuPDF decode and hash it each time
+    if xref:
+        page.insert_image(box, xref=xref, overlay=True)
+        return xref
+    return page.insert_image(box, stream=stream, overlay=True)
+
+
+def _apply_image(page, stream: bytes, source_size: tuple[int, int], style: str, xref: int = 0) -> int:
+    """Place the watermark image on ``page``; returns the image xref for reuse."""
     import fitz  # type: ignore
 
     width_px, height_px = source_size
@@ -93,43 +105,91 @@ def _apply_image(page, stream: bytes, source_size: tuple[int, int], style: str):
             x = rect.x0
             while x < rect.x1:
                 box = fitz.Rect(x, y, x + target_w, y + target_h)
-                page.insert_image(box, stream=stream, overlay=True)
+                xref = _insert(page, box, stream, xref)
                 x += target_w + 10
             y += target_h + 10
-    else:
-        if style == "stretch":
-            page.insert_image(rect, stream=stream, overlay=True)
-            return
-        target_w = rect.width * 0.5
-        ratio = width_px / height_px
-        target_h = target_w / ratio
-        if target_h > rect.height * 0.6:
-            target_h = rect.height * 0.6
-            target_w = target_h * ratio
-        x0 = rect.x0 + (rect.width - target_w) / 2
-        y0 = rect.y0 + (rect.height - target_h) / 2
-        box = fitz.Rect(x0, y0, x0 + target_w, y0 + target_h)
-        page.insert_image(box, stream=stream, overlay=True)
+        return xref
+    if style == "stretch":
+        return _insert(page, rect, stream, xref)
+    target_w = rect.width * 0.5
+    ratio = width_px / height_px
+    target_h = target_w / ratio
+    if target_h > rect.height * 0.6:
+        target_h = rect.height * 0.6
+        target_w = target_h * ratio
+    x0 = rect.x0 + (rect.width - target_w) / 2
+    y0 = rect.y0 + (rect.height - target_h) / 2
+    box = fitz.Rect(x0, y0, x0 + target_w, y0 + target_h)
+    return _insert(page, box, stream, xref)
+
+
+def _stamp_layer(doc, draw) -> None:
+    """Draw a full-page layer once per distinct page size and stamp it on every page.
+
+    ``draw(page)`` paints the layer onto a blank template page; each target
+    page then shows the template as a Form XObject that PyMuPDF embeds once
+    and references from every page of that size.
+    """
+    import fitz  # type: ignore
 
+    templates: Dict[Tuple[float, float], "fitz.Document"] = {}
+    stamps: Dict[tuple, int] = {}
+    try:
+        for page in doc:
+            rect = page.rect
+            size = (round(rect.width, 2), round(rect.height, 2))
+            template = templates.get(size)
+            if template is None:
+                template = fitz.open()
+                draw(template.new_page(width=rect.width, height=rect.height))
+                templates[size] = template
+            # Pages sharing one /Resources dict also share the stamp's content stream;
+            # otherwise every page adds a name to that dict and each later page rescans it
+            kind, resources = doc.xref_get_key(page.xref, "Resources")
+            key = (size, page.rotation, tuple(page.mediabox), tuple(page.cropbox), resources) if kind == "xref" else None
+            stamp = stamps.get(key) if key else None
+            if stamp:
+                page.wrap_contents()
+                contents = " ".join(f"{x} 0 R" for x in [*page.get_contents(), stamp])
+                doc.xref_set_key(page.xref, "Contents", f"[{contents}]")
+            else:
+                page.show_pdf_page(rect, template, 0, overlay=True)
+                if key:
+                    stamps[key] = page.get_contents()[-1]
+    finally:
+        for template in templates.values():
+            template.close()
+
+
+def _find_image(paths: List[str]) -> str | None:
+    for path in reversed(paths):
+        if os.path.splitext(path)[1].lower() in {".png", ".jpg", ".jpeg", ".bmp"}:
+            return path
+    return None
 
-def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
-    import fitz  # type: ignore
 
+def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
     pdf_path = None
-    image_path = None
     for path in upload_paths:
-        ext = os.path.splitext(path)[1].lower()
-        if ext == ".pdf":
+        if os.path.splitext(path)[1].lower() == ".pdf":
             pdf_path = path
-        elif ext in {".png", ".jpg", ".jpeg", ".bmp"}:
-            image_path = path
 
     if not pdf_path:
         raise ValueError("Upload a PDF to watermark")
 
+    out_name = f"{job.id}_watermark.pdf"
+    out_path = os.path.join(job.workspace_path, out_name)
+    with edit_pdf(pdf_path, out_path, bool(job.options.get("incremental"))) as doc:
+        apply(job, doc, upload_paths)
+
+    return {"files": [out_path]}
+
+
+def apply(job, doc, assets: List[str]):
+    """Watermark every page of the open document; also a pipeline step."""
+    image_path = _find_image(assets)
     mode = job.options.get("mode") or ("image" if image_path else "text")
     style = (job.options.get("style") or "diagonal").lower()
-    doc = fitz.open(pdf_path)
 
     if mode == "image":
         if not image_path:
@@ -142,8 +202,13 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
         else:
             styled_img = base_img
         img_stream, w_px, h_px = _image_to_bytes(styled_img)
-        for page in doc:
-            _apply_image(page, img_stream, (w_px, h_px), style)
+        if style == "tile":
+            # Dozens of placements per page: build the tile grid once as a template
+            _stamp_layer(doc, lambda page: _apply_image(page, img_stream, (w_px, h_px), style))
+        else:
+            xref = 0
+            for page in doc:
+                xref = _apply_image(page, img_stream, (w_px, h_px), style, xref)
     else:
         text = job.options.get("text", "CONFIDENTIAL") or "CONFIDENTIAL"
         font = job.options.get("font", "Helvetica")
@@ -151,12 +216,10 @@ def process(job, upload_paths: List[str]) -> Dict[str, List[str]]:
         bold = bool(job.options.get("bold"))
         italic = bool(job.options.get("italic"))
         underline = bool(job.options.get("underline"))
-        for page in doc:
-            _draw_text(page, text, font, size, style, bold, italic, underline)
-
-    out_name = f"{job.id}_watermark.pdf"
-    out_path = os.path.join(job.workspace_path, out_name)
-    doc.save(out_path)
-    doc.close()
-
-    return {"files": [out_path]}
+        if style == "tile":
+            # Same grid as drawing on each page, but laid out once per page size
+            _stamp_layer(doc, lambda page: _draw_text(page, text, font, size, style, bold, italic, underline))
+        else:
+            for page in doc:
+                _draw_text(page, text, font, size, style, bold, italic, underline)
+    return doc
@@ -1,34 +1,22 @@
 from __future__ import annotations
 
 import os
-import shutil
-import subprocess
 import zipfile
 import html as html_lib
 import xml.etree.ElementTree as ET
 from typing import Any, Dict, List
 
-
-def _which(cmd: str) -> str | None:
-    return shutil.which(cmd)
+from ...utils import libreoffice
+from ...utils.text_layout import wrap, write_pages
 
 
 def _libreoffice_exe() -> str | None:
-    for name in ("soffice", "soffice.bin"):
-        p = _which(name)
-        if p:
-            return p
-    return None
+    return libreoffice.find_executable()
 
 
-def _convert_with_libreoffice(inp: str, out_dir: str) -> str:
-    exe = _libreoffice_exe()
-    if not exe:
-        raise FileNotFoundError("LibreOffice (soffice) not found")
-    cmd = [exe, "--headless", "--nologo", "--convert-to", "pdf", "--outdir", out_dir, inp]
-    subprocess.run(cmd, check=True)
-    base = os.path.splitext(os.path.basename(inp))[0] + ".pdf"
-    return os.path.join(out_dir, base)
+def _convert_with_libreoffice(inp: str, out_dir: str, jobs_dir: str | None = None) -> str:
+    # Runs on the shared pool of long-lived LibreOffice instances
+    return libreoffice.convert(inp, out_dir, jobs_dir=jobs_dir)
 
 
 def process(job, upload_paths: List[str]) -> Dict[str, Any]:
@@ -40,7 +28,7 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
 
     # Convert via LibreOffice (best fidelity; no extra Python libs)
     if _libreoffice_exe():
-        produced = _convert_with_libreoffice(src, job.workspace_path)
+        produced = _convert_with_libreoffice(src, job.workspace_path, job.jobs_dir)
         if os.path.abspath(produced) != os.path.abspath(out_path):
             os.replace(produced, out_path)
         return {"files": [out_path]}
@@ -73,41 +61,16 @@ def process(job, upload_paths: List[str]) -> Dict[str, Any]:
                 if para:
                     paragraphs.append(para)
 
-        # Minimal word-wrap using text width measurement
-        def wrap_lines(txt: str, max_width: float, font: str, size: float) -> list[str]:
-            words = txt.split()
-            lines: list[str] = []
-            line = ""
-            for w in words:
-                candidate = (line + " " + w) if line else w
-                if fitz.get_text_length(candidate, fontname=font, fontsize=size) <= max_width:
-                    line = candidate
-                else:
-                    if line:
-                        lines.append(line)
-                    line = w
-            if line:
-                lines.append(line)
-            return lines
-
         doc = fitz.open()
         page_size = fitz.paper_rect("a4")
         margin = 72  # 1 inch
         max_width = page_size.width - 2 * margin
-        y = margin
         line_height = 16  # px at 12pt with some leading
         font = "helv"
         size = 12
-        page = doc.new_page(width=page_size.width, height=page_size.height)
-        for para in paragraphs:
-            for line in wrap_lines(para, max_width, font, size):
-                if y + line_height > page_size.height - margin:
-                    page = doc.new_page(width=page_size.width, height=page_size.height)
-                    y = margin
-                page.insert_text((margin, y), line, fontname=font, fontsize=size)
-                y += line_height
-            # add a blank line between paragraphs
-            y += line_height
+        # A blank line between paragraphs
+        wrapped = (wrap(para, max_width, font, size) for para in paragraphs)
+        write_pages(doc, wrapped, page_size.width, page_size.height, margin, font, size, line_height, line_height)
         doc.save(out_path)
         doc.close()
         return {"files": [out_path]}
@@ -1,17 +1,46 @@
 from __future__ import annotations
 
+import functools
 import json
 import os
-from flask import Blueprint, current_app, request, jsonify, url_for, send_from_directory, abort
+import time
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    request,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
 from ..models.job import Job
-from ..extensions import task_backend
+from ..models.tools import get as get_tool
+from ..extensions import sweeper, task_backend
 from .. import extensions as _ext
-from ..utils.files import save_uploads
-from ..tasks.jobs import dispatch_tool
+from ..utils import metrics, page_cache, result_cache
+from ..utils.files import count_pages, follow_file, save_uploads
+from ..utils.page_cache import page_key
+from ..utils.raster import RenderSpec, render_page, resolve_spec
+from ..utils.result_cache import file_sha256
+from ..tasks import events
+from ..tasks.batch import BatchError, start_batch
+from ..tasks.jobs import dispatch_tool, task_failed
+from ..tasks.pipeline import PIPELINE_TOOL, PipelineError, dispatch_pipeline, parse_steps
+from ..tasks.sweeper import mark_used, trash_workspace
 
 
 bp = Blueprint("api", __name__)
 
+# Event streams re-read the store when idle (updates from worker processes
+# without a shared broker) and send a comment line to keep proxies open.
+_STREAM_HEARTBEAT_SECONDS = 15.0
+
+# Uploads kept only for page thumbnails are stored as jobs of this pseudo tool
+PREVIEW_TOOL = "preview"
+_THUMBNAILS_PER_LISTING = 50
+
 
 @bp.post("/jobs")
 def create_job():
@@ -25,45 +54,250 @@ def create_job():
     if not tool:
         return jsonify({"error": "Missing tool"}), 400
 
-    job = Job.new(current_app.config["JOBS_DIR"], tool=tool, options=options)
     files = request.files.getlist("files")
+    batch_raw = request.form.get("batch") or (request.get_json(silent=True) or {}).get("batch")
+    batch = str(batch_raw).lower() in {"1", "true", "yes", "y"}
+    if tool != PIPELINE_TOOL and not get_tool(tool):
+        return jsonify({"error": f"Unknown tool: {tool}"}), 400
+    if tool == PIPELINE_TOOL:
+        try:
+            parse_steps(options)
+        except PipelineError as e:
+            return jsonify({"error": str(e)}), 400
+    elif batch:
+        spec = get_tool(tool)
+        if not spec or not spec.batchable:
+            return jsonify({"error": f"Tool does not support batches: {tool}"}), 400
+        limit = current_app.config.get("BATCH_MAX_ITEMS", 500)
+        if limit and len(files) > limit:
+            return jsonify({"error": f"Too many files for one batch (max {limit})"}), 400
+
+    job = Job.new(current_app.config["JOBS_DIR"], tool=tool, options=options)
     upload_paths: list[str] = []
     if files:
         upload_paths = save_uploads(job.workspace_path, files)
         job.save()
-    task_backend.enqueue(dispatch_tool, job.to_dict(), upload_paths)
+    if batch:
+        # Each input becomes its own task; the last one to finish bundles the outputs
+        try:
+            items = start_batch(job, upload_paths, task_backend.enqueue)
+        except BatchError as e:
+            job.update(status="error", error_message=str(e))
+            return jsonify({"error": str(e), "job_id": job.id}), 400
+        return jsonify({"job_id": job.id, "status": job.status, "items": items}), 202
+    func = dispatch_pipeline if tool == PIPELINE_TOOL else dispatch_tool
+    task_backend.enqueue(
+        func,
+        job.to_dict(),
+        upload_paths,
+        tool=job.tool,
+        inputs=upload_paths,
+        on_error=functools.partial(task_failed, job.to_dict()),
+    )
 
     return jsonify({"job_id": job.id, "status": job.status}), 202
 
 
+@bp.get("/jobs")
+def list_jobs():
+    jobs_dir = current_app.config["JOBS_DIR"]
+    filters = {k: request.args.get(k) for k in ("status", "tool", "user_id")}
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    jobs = Job.query(jobs_dir, limit=limit, offset=offset, **filters)
+    return jsonify({"jobs": [j.to_dict() for j in jobs], "total": Job.count(jobs_dir, **filters)})
+
+
+@bp.get("/queues")
+def queue_stats():
+    return jsonify({"lanes": task_backend.stats()})
+
+
+@bp.get("/storage")
+def storage_stats():
+    return jsonify(sweeper.stats())
+
+
+@bp.get("/cache")
+def cache_stats():
+    cache = result_cache.cache_for(current_app.config["JOBS_DIR"])
+    return jsonify(cache.stats() if cache else {"enabled": False})
+
+
+@bp.get("/cache/pages")
+def page_cache_stats():
+    cache = page_cache.cache_for(current_app.config["JOBS_DIR"])
+    return jsonify(cache.stats() if cache else {"enabled": False})
+
+
 @bp.get("/jobs/<job_id>")
 def get_job(job_id: str):
     try:
         job = Job.load(current_app.config["JOBS_DIR"], job_id)
     except FileNotFoundError:
         return jsonify({"error": "Not found"}), 404
-    data = job.to_dict()
+    return jsonify(_with_download_urls(job.to_dict()))
+
+
+@bp.get("/jobs/<job_id>/events")
+def job_events(job_id: str):
+    jobs_dir = current_app.config["JOBS_DIR"]
+    try:
+        Job.load(jobs_dir, job_id)
+    except FileNotFoundError:
+        return jsonify({"error": "Not found"}), 404
+
+    def stream():
+        # Subscribe before reading the current state so no transition is missed
+        sub = events.subscribe(job_id)
+        try:
+            data = Job.load(jobs_dir, job_id).to_dict()
+            last = None
+            quiet_since = time.monotonic()
+            while True:
+                key = (data.get("status"), data.get("progress"))
+                if key != last:
+                    last = key
+                    quiet_since = time.monotonic()
+                    yield f"event: job\ndata: {json.dumps(_with_download_urls(data))}\n\n"
+                if data.get("status") in ("done", "error"):
+                    return
+                update = sub.get(timeout=_STREAM_HEARTBEAT_SECONDS)
+                if update is not None:
+                    data = update
+                    if time.monotonic() - quiet_since < _STREAM_HEARTBEAT_SECONDS:
+                        continue
+                # Nothing sent for a heartbeat: resync with the store in case an
+                # event was dropped (full queue, worker crash) or the job deleted
+                try:
+                    data = Job.load(jobs_dir, job_id).to_dict()
+                except FileNotFoundError:
+                    return
+                quiet_since = time.monotonic()
+                yield ": keep-alive\n\n"
+        finally:
+            sub.close()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(stream()), mimetype="text/event-stream", headers=headers)
+
+
+@bp.post("/previews")
+def create_preview():
+    files = request.files.getlist("files")
+    if len(files) != 1:
+        return jsonify({"error": "Upload exactly one PDF"}), 400
+    jobs_dir = current_app.config["JOBS_DIR"]
+    job = Job.new(jobs_dir, tool=PREVIEW_TOOL)
+    try:
+        src = save_uploads(job.workspace_path, files)[0]
+    except ValueError as e:
+        trash_workspace(jobs_dir, job.id)
+        return jsonify({"error": str(e)}), 400
+    pages = count_pages(src) if src.lower().endswith(".pdf") else 0
+    if not pages:
+        trash_workspace(jobs_dir, job.id)
+        return jsonify({"error": "Not a readable PDF"}), 400
+    # Nothing is rendered here; thumbnails are rendered when first requested
+    manifest = {"files": [], "source": os.path.basename(src), "sha256": file_sha256(src), "pages": pages}
+    job.update(status="done", progress=100, finished_at=time.time(), result_manifest=manifest)
+    return jsonify(_preview_listing(job, 1, _THUMBNAILS_PER_LISTING)), 201
+
+
+@bp.get("/previews/<preview_id>")
+def get_preview(preview_id: str):
+    job = _load_preview(preview_id)
+    if job is None:
+        return jsonify({"error": "Not found"}), 404
+    start = max(request.args.get("start", 1, type=int), 1)
+    count = min(max(request.args.get("count", _THUMBNAILS_PER_LISTING, type=int), 1), _THUMBNAILS_PER_LISTING)
+    return jsonify(_preview_listing(job, start, count))
+
+
+@bp.get("/previews/<preview_id>/pages/<int:page>")
+def preview_thumbnail(preview_id: str, page: int):
+    job = _load_preview(preview_id)
+    if job is None:
+        return jsonify({"error": "Not found"}), 404
+    manifest = job.result_manifest
+    if not 1 <= page <= manifest["pages"]:
+        return jsonify({"error": "No such page"}), 404
+    jobs_dir = current_app.config["JOBS_DIR"]
+    mark_used(job.workspace_path)
+    spec = RenderSpec(dpi=int(current_app.config.get("THUMBNAIL_DPI", 36)), format="auto", quality=70)
+    import fitz  # PyMuPDF
+
+    src = os.path.join(job.workspace_path, "uploads", manifest["source"])
+    with fitz.open(src) as doc:
+        pdf_page = doc[page - 1]
+        spec = resolve_spec(pdf_page, spec)
+        key = page_key(manifest["sha256"], page - 1, spec)
+        if key in request.if_none_match:
+            return Response(status=304, headers={"ETag": f'"{key}"'})
+
+        cache = page_cache.cache_for(jobs_dir)
+        hit = cache.get(key) if cache else None
+        if hit is None:
+            hit = render_page(pdf_page, spec)
+            if cache:
+                cache.put(key, *hit)
+    ext, data = hit
+    response = Response(data, mimetype="image/jpeg" if ext == "jpg" else f"image/{ext}")
+    response.set_etag(key)
+    # Content-addressed, so the browser may keep it as long as the preview lives
+    response.headers["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
+def _load_preview(preview_id: str) -> Job | None:
+    try:
+        job = Job.load(current_app.config["JOBS_DIR"], preview_id)
+    except FileNotFoundError:
+        return None
+    return job if job.tool == PREVIEW_TOOL and job.result_manifest else None
+
+
+def _preview_listing(job: Job, start: int, count: int) -> dict:
+    total = job.result_manifest["pages"]
+    pages = range(start, min(start + count, total + 1))
+    return {
+        "preview_id": job.id,
+        "pages": total,
+        "thumbnails": [
+            {"page": n, "url": url_for("api.preview_thumbnail", preview_id=job.id, page=n)} for n in pages
+        ],
+    }
+
+
+def _with_download_urls(data: dict) -> dict:
+    manifest = data.get("result_manifest") or {}
+    if _ext.signer and data.get("status") in ("queued", "running") and "batch" not in manifest:
+        # The output can be downloaded while it is still being written
+        spec = get_tool(data.get("tool") or "")
+        if spec and spec.stream_file:
+            data["stream_url"] = signed_download_url(data["id"], spec.stream_file)
     if _ext.signer and data.get("result_manifest") and data["result_manifest"].get("files"):
         files = data["result_manifest"]["files"]
         for f in files:
             fname = f.get("filename")
             if fname and not f.get("url"):
-                f["url"] = signed_download_url(job.id, fname)
-    return jsonify(data)
+                f["url"] = signed_download_url(data["id"], fname)
+    return data
 
 
 @bp.delete("/jobs/<job_id>")
 def delete_job(job_id: str):
-    workspace = os.path.join(current_app.config["JOBS_DIR"], job_id)
-    if not os.path.isdir(workspace):
+    jobs_dir = current_app.config["JOBS_DIR"]
+    if not os.path.isdir(os.path.join(jobs_dir, job_id)):
         return jsonify({"error": "Not found"}), 404
 
+    # Rename into the trash area; the sweeper removes the files in the background
     try:
-        import shutil
-
-        shutil.rmtree(workspace, ignore_errors=True)
+        if not trash_workspace(jobs_dir, job_id):
+            return jsonify({"error": "Not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    sweeper.wake()
     return jsonify({"ok": True})
 
 
@@ -83,8 +317,44 @@ def download(job_id: str, token: str, filename: str):
             abort(403)
     except Exception:
         abort(403)
-    workspace = os.path.join(current_app.config["JOBS_DIR"], job_id)
-    return send_from_directory(workspace, filename, as_attachment=True, download_name=filename)
+    jobs_dir = current_app.config["JOBS_DIR"]
+    workspace = os.path.join(jobs_dir, job_id)
+    started = time.perf_counter()
+    mark_used(workspace)
+    if not os.path.exists(os.path.join(workspace, filename)):
+        response = _follow_download(jobs_dir, job_id, filename)
+        if response is not None:
+            return response
+    response = send_from_directory(workspace, filename, as_attachment=True, download_name=filename)
+    elapsed = time.perf_counter() - started
+
+    def _write(m) -> None:
+        m.observe("essential_tools_stage_seconds", elapsed, stage="download")
+        m.inc("essential_tools_download_bytes_total", response.content_length or 0)
+
+    metrics.record(jobs_dir, _write)
+    return response
+
+
+def _follow_download(jobs_dir: str, job_id: str, filename: str):
+    # Only outputs a tool declares as streamable, and only while its job is live
+    try:
+        job = Job.load(jobs_dir, job_id)
+    except FileNotFoundError:
+        return None
+    spec = get_tool(job.tool)
+    if not spec or spec.stream_file != filename or job.status not in ("queued", "running"):
+        return None
+
+    def finished() -> bool:
+        try:
+            return Job.load(jobs_dir, job_id).status in ("done", "error")
+        except FileNotFoundError:
+            return True
+
+    path = os.path.join(jobs_dir, job_id, filename)
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(follow_file(path, finished)), mimetype="application/zip", headers=headers)
 
 
 def signed_download_url(job_id: str, filename: str) -> str:
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from flask import Blueprint, Response, current_app
+
+from ..extensions import sweeper, task_backend
+from ..models.job_store import store_for
+from ..utils import libreoffice, metrics, page_cache, result_cache
+
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.get("/metrics")
+def export():
+    jobs_dir = current_app.config["JOBS_DIR"]
+    store = metrics.metrics_for(jobs_dir)
+    if store is None:
+        return Response("metrics disabled\n", status=404, mimetype="text/plain")
+
+    samples = list(store.samples())
+    # Point-in-time gauges owned by the web process
+    for tool, status, n in store_for(jobs_dir).counts():
+        samples.append(("essential_tools_jobs", metrics.format_labels({"tool": tool, "status": status}), n))
+    for lane, stats in task_backend.stats().items():
+        in_flight = stats.get("in_flight", stats.get("queued", 0))
+        samples.append(("essential_tools_lane_in_flight", metrics.format_labels({"lane": lane}), in_flight))
+        for pool in ("threads", "processes"):
+            if pool in stats:
+                samples.append(("essential_tools_lane_workers", metrics.format_labels({"lane": lane, "pool": pool}), stats[pool]))
+    cache = result_cache.cache_for(jobs_dir)
+    if cache:
+        cstats = cache.stats()
+        for event in ("hits", "misses", "evictions"):
+            samples.append(("essential_tools_result_cache_events_total", metrics.format_labels({"event": event}), cstats[event]))
+    pages = page_cache.cache_for(jobs_dir)
+    if pages:
+        pstats = pages.stats()
+        for event in ("memory_hits", "disk_hits", "misses", "evictions"):
+            samples.append(("essential_tools_page_cache_events_total", metrics.format_labels({"event": event}), pstats[event]))
+        samples.append(("essential_tools_page_cache_saved_bytes_total", "", pstats["bytes_saved"]))
+    lstats = libreoffice.pool_stats()
+    if lstats:
+        labels = metrics.format_labels({"mode": lstats["mode"]})
+        samples.append(("essential_tools_libreoffice_instances_running", labels, lstats["running"]))
+        samples.append(("essential_tools_libreoffice_restarts_total", labels, lstats["restarts"]))
+    sstats = sweeper.stats()
+    samples.append(("essential_tools_storage_reclaimed_bytes_total", "", sstats["bytes_reclaimed"]))
+    samples.append(("essential_tools_storage_usage_bytes", "", sstats["usage_bytes"]))
+
+    return Response(metrics.render(samples), mimetype="text/plain; version=0.0.4")
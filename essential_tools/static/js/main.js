@@ -150,6 +150,75 @@
     setJobs(Array.from(ids));
   };
 
+  // Follow a job over Server-Sent Events; fall back to 1s polling when
+  // EventSource is unavailable or the stream drops before the job finishes.
+  window.essentialToolsWatchJob = function(id, onUpdate){
+    const isFinal = (data) => data && (data.status === 'done' || data.status === 'error');
+    const poll = async () => {
+      try {
+        const res = await fetch(`/api/jobs/${id}`);
+        const data = await res.json();
+        onUpdate(data);
+        if (!res.ok || isFinal(data)) return;
+      } catch { /* retry */ }
+      setTimeout(poll, 1000);
+    };
+    if (!window.EventSource) { poll(); return; }
+    let finished = false;
+    const source = new EventSource(`/api/jobs/${id}/events`);
+    source.addEventListener('job', (event) => {
+      const data = JSON.parse(event.data);
+      onUpdate(data);
+      if (isFinal(data)) { finished = true; source.close(); }
+    });
+    source.onerror = () => {
+      source.close();
+      if (!finished) poll();
+    };
+  };
+
+  // Page thumbnails for the PDF chosen in `input`. The upload happens once;
+  // each thumbnail is only requested when it scrolls into view.
+  window.essentialToolsPreview = function(input, container){
+    if (!input || !container) return;
+    input.addEventListener('change', async () => {
+      container.innerHTML = '';
+      const file = input.files && input.files[0];
+      if (!file) return;
+      const fd = new FormData();
+      fd.append('files', file);
+      let data;
+      try {
+        const res = await fetch('/api/previews', { method: 'POST', body: fd });
+        data = await res.json();
+        if (!res.ok) return;
+      } catch { return; }
+      window.essentialToolsAddJob(data.preview_id);
+      const load = (img) => { img.src = img.dataset.src; };
+      const observer = window.IntersectionObserver
+        ? new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+              if (!entry.isIntersecting) return;
+              observer.unobserve(entry.target);
+              load(entry.target);
+            });
+          }, { rootMargin: '200px' })
+        : null;
+      for (let n = 1; n <= data.pages; n++) {
+        const fig = document.createElement('figure');
+        fig.className = 'page-preview';
+        const img = document.createElement('img');
+        img.alt = `Page ${n}`;
+        img.dataset.src = `/api/previews/${data.preview_id}/pages/${n}`;
+        const cap = document.createElement('figcaption');
+        cap.textContent = n;
+        fig.append(img, cap);
+        container.appendChild(fig);
+        if (observer) observer.observe(img); else load(img);
+      }
+    });
+  };
+
   window.addEventListener('beforeunload', () => {
     const ids = getJobs();
     ids.forEach((id) => {
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+import zipfile
+from typing import Any, Callable, Dict, List
+
+from ..models.job import ITEMS_DIRNAME, Job
+from ..models.tools import get as get_tool
+from ..utils import metrics
+from . import events
+from .jobs import _update, failure_message, run_processor
+
+_RESULT_FILE = "result.json"
+_BUNDLE_CLAIM = ".bundle"
+# Already-compressed formats are stored as-is in the bundle
+_STORED_EXTS = {".pdf", ".zip", ".png", ".jpg", ".jpeg", ".docx", ".pptx"}
+
+
+class BatchError(ValueError):
+    pass
+
+
+def split_items(tool, upload_paths: List[str]) -> List[List[str]]:
+    """One item per upload; shared uploads (e.g. a signature) join every item."""
+    shared = [p for p in upload_paths if os.path.splitext(p)[1].lower() in tool.batch_shared]
+    items = [[p] + shared for p in upload_paths if p not in shared]
+    if not items:
+        raise BatchError("Upload at least one file to process")
+    return items
+
+
+def start_batch(job: Job, upload_paths: List[str], enqueue: Callable[..., Any]) -> int:
+    """Mark ``job`` as a batch parent and hand each item to ``enqueue`` (``TaskBackend.enqueue``)."""
+    tool = get_tool(job.tool)
+    if not tool or not tool.processor:
+        raise BatchError(f"Tool not implemented: {job.tool}")
+    if not tool.batchable:
+        raise BatchError(f"Tool does not support batches: {job.tool}")
+    items = split_items(tool, upload_paths)
+    _update(
+        job,
+        status="running",
+        progress=5,
+        result_manifest={"files": [], "cache": None, "batch": {"total": len(items), "done": 0, "failed": 0, "items": []}},
+    )
+    for index, paths in enumerate(items):
+        args = (job.to_dict(), index, len(items), paths)
+        enqueue(dispatch_batch_item, *args, tool=job.tool, inputs=paths, on_error=functools.partial(batch_item_failed, *args))
+    return len(items)
+
+
+def _item_dir(job: Job, index: int) -> str:
+    return os.path.join(job.workspace_path, ITEMS_DIRNAME, str(index))
+
+
+def _write_result(path: str, data: Dict[str, Any]) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_results(job: Job, total: int) -> List[Dict[str, Any]]:
+    results = []
+    for index in range(total):
+        try:
+            with open(os.path.join(_item_dir(job, index), _RESULT_FILE), "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return results
+
+
+def dispatch_batch_item(job_dict: Dict[str, Any], index: int, total: int, upload_paths: List[str]) -> None:
+    parent = Job(**job_dict)
+    if not os.path.isdir(parent.workspace_path):
+        return  # the batch was deleted
+    workspace = _item_dir(parent, index)
+    os.makedirs(workspace, exist_ok=True)
+    # Processors only read id, options and workspace_path; the item is never stored
+    item = Job(id=f"{parent.id}-{index}", tool=parent.tool, options=dict(parent.options), workspace_path=workspace)
+    result: Dict[str, Any] = {"index": index, "input": os.path.basename(upload_paths[0])}
+    try:
+        tool = get_tool(parent.tool)
+        files, cache_state = run_processor(item, tool, upload_paths)
+        result.update(status="done", files=[os.path.basename(f) for f in files], cache=cache_state)
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    _write_result(os.path.join(workspace, _RESULT_FILE), result)
+    _collect(parent, total)
+
+
+def batch_item_failed(job_dict: Dict[str, Any], index: int, total: int, upload_paths: List[str], exc: BaseException) -> None:
+    """``on_error`` for dispatch_batch_item: record the item as failed so the batch can finish."""
+    parent = Job(**job_dict)
+    workspace = _item_dir(parent, index)
+    path = os.path.join(workspace, _RESULT_FILE)
+    if not os.path.isdir(parent.workspace_path) or os.path.exists(path):
+        return
+    os.makedirs(workspace, exist_ok=True)
+    result = {"index": index, "input": os.path.basename(upload_paths[0]), "status": "error", "error": failure_message(exc)}
+    _write_result(path, result)
+    _collect(parent, total)
+
+
+def _collect(parent: Job, total: int) -> None:
+    results = _read_results(parent, total)
+    if len(results) < total:
+        # Items finish in other processes: only ever raise progress on a
+        # running record, so a late writer can't clobber the final manifest
+        if parent.advance_progress(5 + int(90 * len(results) / total)):
+            try:
+                events.publish(parent.id, Job.load(os.path.dirname(parent.workspace_path), parent.id).to_dict())
+            except FileNotFoundError:
+                pass
+        return
+    # Every item has reported in; exactly one of them builds the bundle
+    try:
+        fd = os.open(os.path.join(parent.workspace_path, ITEMS_DIRNAME, _BUNDLE_CLAIM), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return
+    os.close(fd)
+    try:
+        parent = Job.load(os.path.dirname(parent.workspace_path), parent.id)
+    except FileNotFoundError:
+        return
+    _finalize(parent, sorted(results, key=lambda r: r["index"]))
+
+
+def _bundle_name(item_id: str, result: Dict[str, Any], filename: str) -> str:
+    # "<job>-3_compressed.pdf" from invoice.pdf becomes "invoice_compressed.pdf"
+    stem = os.path.splitext(result["input"])[0]
+    prefix = f"{item_id}_"
+    suffix = filename[len(prefix):] if filename.startswith(prefix) else filename
+    return f"{stem}_{suffix}"
+
+
+def _finalize(parent: Job, results: List[Dict[str, Any]]) -> None:
+    jobs_dir = os.path.dirname(parent.workspace_path)
+    summary: Dict[str, Any] = {
+        "total": len(results),
+        "done": sum(1 for r in results if r["status"] == "done"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+    }
+    items = []
+    used: set[str] = set()
+    for r in results:
+        entry: Dict[str, Any] = {"input": r["input"], "status": r["status"]}
+        if r["status"] == "error":
+            entry["error"] = r["error"]
+        else:
+            entry["files"] = []
+            for filename in r["files"]:
+                arcname = _bundle_name(f"{parent.id}-{r['index']}", r, filename)
+                # Same-named inputs would otherwise overwrite each other
+                base, ext = os.path.splitext(arcname)
+                n = 1
+                while arcname in used:
+                    arcname = f"{base}-{n}{ext}"
+                    n += 1
+                used.add(arcname)
+                entry["files"].append(arcname)
+        items.append(entry)
+    summary["items"] = items
+    try:
+        if not summary["done"]:
+            raise BatchError(f"All {summary['total']} items failed")
+        bundle = os.path.join(parent.workspace_path, f"{parent.id}_batch.zip")
+        with zipfile.ZipFile(bundle, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for r, entry in zip(results, items):
+                for filename, arcname in zip(r.get("files", []), entry.get("files", [])):
+                    ext = os.path.splitext(arcname)[1].lower()
+                    compress = zipfile.ZIP_STORED if ext in _STORED_EXTS else zipfile.ZIP_DEFLATED
+                    zf.write(os.path.join(_item_dir(parent, r["index"]), filename), arcname, compress_type=compress)
+        stored = _update(
+            parent,
+            status="done",
+            progress=100,
+            finished_at=time.time(),
+            result_manifest={
+                "files": [{"filename": os.path.basename(bundle), "size": os.path.getsize(bundle)}],
+                "cache": None,
+                "batch": summary,
+            },
+        )
+    except Exception as e:
+        stored = _update(
+            parent,
+            status="error",
+            finished_at=time.time(),
+            error_message=str(e),
+            result_manifest={"files": [], "cache": None, "batch": summary},
+        )
+    if not stored:
+        return  # deleted while its items ran
+    metrics.record(
+        jobs_dir, lambda m: m.inc("essential_tools_jobs_finished_total", tool=parent.tool, status=parent.status)
+    )
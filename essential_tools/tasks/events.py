@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Set
+
+try:
+    import redis
+except Exception:  # pragma: no cover - optional in dev
+    redis = None
+
+CHANNEL_PREFIX = "essential-tools:job:"
+
+
+class _LocalSubscription:
+    def __init__(self, broker: "LocalBroker", job_id: str) -> None:
+        self._broker = broker
+        self._job_id = job_id
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=256)
+
+    def get(self, timeout: float) -> Dict[str, Any] | None:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._broker._unsubscribe(self._job_id, self)
+
+
+class LocalBroker:
+    """Fan-out to subscribers in this process only."""
+
+    def __init__(self) -> None:
+        self._subs: Dict[str, Set[_LocalSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            subs = list(self._subs.get(job_id, ()))
+        for sub in subs:
+            try:
+                sub._queue.put_nowait(data)
+            except queue.Full:
+                pass
+
+    def subscribe(self, job_id: str) -> _LocalSubscription:
+        sub = _LocalSubscription(self, job_id)
+        with self._lock:
+            self._subs[job_id].add(sub)
+        return sub
+
+    def _unsubscribe(self, job_id: str, sub: _LocalSubscription) -> None:
+        with self._lock:
+            subs = self._subs.get(job_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[job_id]
+
+
+class ForwardingBroker(LocalBroker):
+    """Lane worker processes: publish through the web process's LocalBroker."""
+
+    def __init__(self, channel) -> None:
+        super().__init__()
+        self._channel = channel
+
+    def publish(self, job_id: str, data: Dict[str, Any]) -> None:
+        self._channel.put_nowait((job_id, data))
+
+
+def _forward(channel, target: LocalBroker) -> None:
+    while True:
+        try:
+            job_id, data = channel.get()
+        except (EOFError, OSError):
+            return
+        target.publish(job_id, data)
+
+
+def worker_channel(mp_context=None):
+    """Queue that lane worker processes publish into (see ForwardingBroker).
+
+    None when the broker already reaches every process (Redis).
+    """
+    target = broker()
+    if not isinstance(target, LocalBroker):
+        return None
+    channel = (mp_context or multiprocessing).Queue()
+    threading.Thread(target=_forward, args=(channel, target), name="events-forward", daemon=True).start()
+    return channel
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub) -> None:
+        self._pubsub = pubsub
+
+    def get(self, timeout: float) -> Dict[str, Any] | None:
+        msg = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not msg:
+            return None
+        return json.loads(msg["data"])
+
+    def close(self) -> None:
+        try:
+            self._pubsub.close()
+        except Exception:
+            pass
+
+
+class RedisBroker:
+    """Redis pub/sub; reaches subscribers in every web process."""
+
+    def __init__(self, url: str) -> None:
+        self._conn = redis.from_url(url)  # type: ignore[union-attr]
+
+    def publish(self, job_id: str, data: Dict[str, Any]) -> None:
+        self._conn.publish(CHANNEL_PREFIX + job_id, json.dumps(data, separators=(",", ":")))
+
+    def subscribe(self, job_id: str) -> _RedisSubscription:
+        pubsub = self._conn.pubsub()
+        pubsub.subscribe(CHANNEL_PREFIX + job_id)
+        return _RedisSubscription(pubsub)
+
+
+_broker: Any = None
+
+
+def configure(redis_url: str | None = None, channel=None) -> None:
+    global _broker
+    if redis_url and redis:
+        _broker = RedisBroker(redis_url)
+    elif channel is not None:
+        _broker = ForwardingBroker(channel)
+    else:
+        _broker = LocalBroker()
+
+
+def broker():
+    if _broker is None:
+        configure(os.getenv("REDIS_URL"))
+    return _broker
+
+
+def publish(job_id: str, data: Dict[str, Any]) -> None:
+    # Progress events are best-effort; never let them fail a job
+    try:
+        broker().publish(job_id, data)
+    except Exception:
+        pass
+
+
+def subscribe(job_id: str):
+    return broker().subscribe(job_id)
@@ -1,43 +1,169 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, Any, List
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Tuple
 from pypdf import PdfReader, PdfWriter
 
-from ..models.job import Job
+from ..models import job_store
+from ..models.job import ACTIVE_STATUSES, Job
 from ..models.tools import get as get_tool
+from ..utils import external, libreoffice, metrics, page_cache, parallel, result_cache
+from . import events
 
+# Config keys that worker processes need to see the same way as the web process
+WORKER_SETTINGS = (
+    "JOB_STORE",
+    "REDIS_URL",
+    "RESULT_CACHE_ENABLED",
+    "RESULT_CACHE_MAX_BYTES",
+    "RESULT_CACHE_EXCLUDE",
+    "PAGE_CACHE_ENABLED",
+    "PAGE_CACHE_MAX_BYTES",
+    "PAGE_CACHE_MEMORY_BYTES",
+    "SIGNATURE_CACHE_ENABLED",
+    "METRICS_ENABLED",
+    "PARALLEL_WORKERS",
+    "PROCESS_START_METHOD",
+    "LIBREOFFICE_POOL_SIZE",
+    "LIBREOFFICE_TIMEOUT",
+    "LIBREOFFICE_MAX_CONVERSIONS",
+    "EXTERNAL_MAX_PROCS",
+    "EXTERNAL_TOOL_LIMITS",
+    "EXTERNAL_TIMEOUT",
+    "EXTERNAL_MEMORY_LIMIT_MB",
+)
 
-def _update(job: Job, **fields):
-    for k, v in fields.items():
-        setattr(job, k, v)
-    job.save()
+
+def worker_settings(config) -> Dict[str, Any]:
+    return {key: config.get(key) for key in WORKER_SETTINGS if key in config}
+
+
+def init_worker(settings: Dict[str, Any]) -> None:
+    # Also used as the process-pool initializer
+    job_store.configure(settings.get("JOB_STORE") or "sqlite")
+    events.configure(settings.get("REDIS_URL") or None, channel=settings.get("EVENTS_CHANNEL"))
+    result_cache.configure(
+        enabled=settings.get("RESULT_CACHE_ENABLED", True),
+        max_bytes=settings.get("RESULT_CACHE_MAX_BYTES", 1024 * 1024 * 1024),
+        exclude=settings.get("RESULT_CACHE_EXCLUDE") or (),
+    )
+    page_cache.configure(
+        enabled=settings.get("PAGE_CACHE_ENABLED", True),
+        max_bytes=settings.get("PAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+        memory_bytes=settings.get("PAGE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024),
+        signatures=settings.get("SIGNATURE_CACHE_ENABLED", True),
+    )
+    metrics.configure(settings.get("METRICS_ENABLED", True))
+    external.configure(
+        max_procs=settings.get("EXTERNAL_MAX_PROCS"),
+        tool_limits=settings.get("EXTERNAL_TOOL_LIMITS"),
+        timeout=settings.get("EXTERNAL_TIMEOUT"),
+        memory_mb=settings.get("EXTERNAL_MEMORY_LIMIT_MB"),
+    )
+    libreoffice.configure(
+        size=settings.get("LIBREOFFICE_POOL_SIZE"),
+        timeout=settings.get("LIBREOFFICE_TIMEOUT"),
+        max_conversions=settings.get("LIBREOFFICE_MAX_CONVERSIONS"),
+    )
+    parallel.configure(
+        workers=settings.get("PARALLEL_WORKERS"),
+        start_method=settings.get("PROCESS_START_METHOD"),
+        share=settings.get("PARALLEL_SHARE"),
+    )
+
+
+def _update(job: Job, **fields) -> bool:
+    """Store and publish ``fields``; False if the job was deleted (nothing is published)."""
+    if not job.update(**fields):
+        return False
+    events.publish(job.id, job.to_dict())
+    return True
+
+
+def failure_message(exc: BaseException) -> str:
+    if isinstance(exc, BrokenProcessPool):
+        return "The worker process stopped unexpectedly"
+    return str(exc) or type(exc).__name__
+
+
+def fail_job(jobs_dir: str, job_id: str, message: str) -> bool:
+    """Mark a queued or running job as failed; False if it already finished or is gone."""
+    try:
+        job = Job.load(jobs_dir, job_id)
+    except FileNotFoundError:
+        return False
+    if job.status not in ACTIVE_STATUSES:
+        return False
+    if not _update(job, status="error", finished_at=time.time(), error_message=message):
+        return False
+    metrics.record(jobs_dir, lambda m: m.inc("essential_tools_jobs_finished_total", tool=job.tool, status="error"))
+    return True
+
+
+def task_failed(job_dict: Dict[str, Any], exc: BaseException) -> None:
+    """``on_error`` for dispatch_tool and dispatch_pipeline: the task died without reporting."""
+    job = Job(**job_dict)
+    fail_job(job.jobs_dir, job.id, failure_message(exc))
+
+
+def run_processor(job: Job, tool, upload_paths: List[str]) -> Tuple[List[str], str | None]:
+    """Run ``tool`` for ``job`` through the result cache; returns (files, cache state)."""
+    jobs_dir = job.jobs_dir
+    started = time.perf_counter()
+    cache = result_cache.cache_for(jobs_dir, tool)
+    key = result_cache.cache_key(job.tool, job.options, upload_paths) if cache else None
+    files = cache.fetch(key, job.id, job.workspace_path) if cache else None
+    if cache:
+        lookup = time.perf_counter() - started
+        metrics.record(
+            jobs_dir, lambda m: m.observe("essential_tools_stage_seconds", lookup, tool=job.tool, stage="cache_lookup")
+        )
+    if files is not None:
+        return files, "hit"
+    result = tool.processor(job, upload_paths)
+    files = result.get("files", [])
+    if cache:
+        cache.store(key, job.id, files)
+    return files, ("miss" if cache else None)
 
 
 def dispatch_tool(job_dict: Dict[str, Any], upload_paths: List[str]):
     job = Job(**job_dict)
+    jobs_dir = job.jobs_dir
+    wait = max(0.0, time.time() - job.created_at)
+    metrics.record(jobs_dir, lambda m: m.observe("essential_tools_job_queue_wait_seconds", wait, tool=job.tool))
+    if not _update(job, status="running", progress=5):
+        return  # deleted while queued
     try:
-        _update(job, status="running", progress=5)
         tool = get_tool(job.tool)
         if not tool or not tool.processor:
             raise NotImplementedError(f"Tool not implemented: {job.tool}")
-        result = tool.processor(job, upload_paths)
-        files = result.get("files", [])
+        files, cache_state = run_processor(job, tool, upload_paths)
+        started = time.perf_counter()
         manifest = []
         for fn in files:
             manifest.append({
                 "filename": os.path.basename(fn),
                 "size": os.path.getsize(fn),
             })
-        _update(
+        if not _update(
             job,
             status="done",
             progress=100,
-            finished_at=(os.path.getmtime(files[0]) if files else None),
-            result_manifest={"files": manifest},
+            finished_at=time.time(),
+            result_manifest={"files": manifest, "cache": cache_state},
+        ):
+            return  # deleted while running
+        finalize = time.perf_counter() - started
+        metrics.record(
+            jobs_dir, lambda m: m.observe("essential_tools_stage_seconds", finalize, tool=job.tool, stage="finalize")
         )
     except Exception as e:  
-        _update(job, status="error", error_message=str(e))
+        if not _update(job, status="error", error_message=str(e)):
+            return
+    metrics.record(jobs_dir, lambda m: m.inc("essential_tools_jobs_finished_total", tool=job.tool, status=job.status))
 
 
 def _parse_ranges(expr: str, total_pages: int):
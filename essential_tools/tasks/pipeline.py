@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from ..models.job import Job
+from ..models.tools import Tool, get as get_tool
+from ..utils import metrics, result_cache
+from .jobs import _update, run_processor
+
+PIPELINE_TOOL = "pipeline"
+MAX_STEPS = 20
+
+
+class PipelineError(ValueError):
+    pass
+
+
+def parse_steps(options: Dict[str, Any]) -> List[Tuple[Tool, Dict[str, Any]]]:
+    """Validate ``options["steps"]``: a list of ``{"tool": slug, "options": {...}}``."""
+    raw = options.get("steps")
+    if not isinstance(raw, list) or not raw:
+        raise PipelineError("Pipeline needs a non-empty list of steps")
+    if len(raw) > MAX_STEPS:
+        raise PipelineError(f"Pipeline has too many steps (max {MAX_STEPS})")
+    steps = []
+    for n, step in enumerate(raw, start=1):
+        if isinstance(step, (list, tuple)) and len(step) == 2:
+            slug, opts = step
+        elif isinstance(step, dict):
+            slug, opts = step.get("tool"), step.get("options")
+        else:
+            raise PipelineError(f"Step {n}: expected {{'tool': ..., 'options': ...}}")
+        tool = get_tool(slug) if isinstance(slug, str) else None
+        if not tool or not tool.processor:
+            raise PipelineError(f"Step {n}: unknown tool {slug!r}")
+        steps.append((tool, dict(opts or {})))
+    return steps
+
+
+def _run(job: Job, steps: List[Tuple[Tool, Dict[str, Any]]], upload_paths: List[str], timings: List[Dict[str, Any]]):
+    import fitz  # type: ignore
+
+    pdfs = [p for p in upload_paths if os.path.splitext(p)[1].lower() == ".pdf"]
+    # The first PDF is the document being worked on; every other upload
+    # (extra PDFs for merge, signature/watermark images) is an asset.
+    assets = [p for p in upload_paths if p not in pdfs[:1]]
+    doc = None  # open document while steps can stay in memory
+    current: List[str] = list(upload_paths)  # otherwise, the files on disk
+    last = len(steps) - 1
+    try:
+        for i, (tool, options) in enumerate(steps):
+            started = time.perf_counter()
+            # The final step writes under the job id, like a single-tool job
+            step_job = Job(
+                id=job.id if i == last else f"{job.id}-{i + 1}",
+                tool=tool.slug,
+                options=options,
+                workspace_path=job.workspace_path,
+            )
+            in_memory = bool(tool.apply or (tool.write_doc and i == last and doc is not None))
+            if in_memory:
+                if doc is None:
+                    source = (pdfs[0] if pdfs else None) if i == 0 else current[0]
+                    if not source or os.path.splitext(source)[1].lower() != ".pdf":
+                        raise PipelineError(f"Step {i + 1} ({tool.slug}) needs a PDF")
+                    doc = fitz.open(source)
+                if tool.apply:
+                    doc = tool.apply(step_job, doc, assets)
+                else:
+                    current = [tool.write_doc(step_job, doc)]
+                    doc.close()
+                    doc = None
+            else:
+                if doc is not None:
+                    # Only steps without an in-memory hook need an intermediate file
+                    path = os.path.join(job.workspace_path, f"{step_job.id}_input.pdf")
+                    doc.save(path, garbage=1, deflate=True)
+                    doc.close()
+                    doc = None
+                    current = [path]
+                if i:
+                    current = current + [a for a in assets if os.path.splitext(a)[1].lower() in tool.batch_shared]
+                current = tool.processor(step_job, current).get("files", [])
+                if i < last and (len(current) != 1 or not current[0].lower().endswith(".pdf")):
+                    raise PipelineError(f"Step {i + 1} ({tool.slug}) must produce a single PDF to continue")
+            timings.append({"tool": tool.slug, "seconds": round(time.perf_counter() - started, 4), "in_memory": in_memory})
+            if i < last and not _update(job, progress=5 + 90 * (i + 1) // len(steps)):
+                raise PipelineError("Job was deleted")
+        if doc is not None:
+            out_path = os.path.join(job.workspace_path, f"{job.id}_pipeline.pdf")
+            doc.save(out_path, garbage=1, deflate=True)
+            current = [out_path]
+    finally:
+        if doc is not None:
+            doc.close()
+    return {"files": current}
+
+
+def dispatch_pipeline(job_dict: Dict[str, Any], upload_paths: List[str]):
+    job = Job(**job_dict)
+    jobs_dir = job.jobs_dir
+    wait = max(0.0, time.time() - job.created_at)
+    metrics.record(jobs_dir, lambda m: m.observe("essential_tools_job_queue_wait_seconds", wait, tool=job.tool))
+    if not _update(job, status="running", progress=5):
+        return  # deleted while queued
+    try:
+        steps = parse_steps(job.options)
+        timings: List[Dict[str, Any]] = []
+        # Cached as a whole, and only when every step may be
+        spec = Tool(
+            slug=PIPELINE_TOOL,
+            title="Pipeline",
+            desc="",
+            category="",
+            processor=lambda j, paths: _run(j, steps, paths, timings),
+            cacheable=all(result_cache.cache_for(jobs_dir, tool) for tool, _ in steps),
+        )
+        files, cache_state = run_processor(job, spec, upload_paths)
+        manifest = [{"filename": os.path.basename(fn), "size": os.path.getsize(fn)} for fn in files]
+        if not _update(
+            job,
+            status="done",
+            progress=100,
+            finished_at=time.time(),
+            result_manifest={"files": manifest, "cache": cache_state, "steps": timings or None},
+        ):
+            return  # deleted while running
+    except Exception as e:
+        if not _update(job, status="error", error_message=str(e)):
+            return
+    metrics.record(jobs_dir, lambda m: m.inc("essential_tools_jobs_finished_total", tool=job.tool, status=job.status))
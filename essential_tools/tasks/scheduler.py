@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Tuple
+
+LANES = ("interactive", "batch")
+
+
+def _timed_call(func: Callable[..., Any], args: tuple, kwargs: dict) -> Tuple[float, Any]:
+    # Runs in the worker; wall-clock start time is comparable across processes
+    return time.time(), func(*args, **kwargs)
+
+
+class Lane:
+    """A named queue with its own thread and process budgets."""
+
+    def __init__(
+        self,
+        name: str,
+        threads: int,
+        processes: int,
+        mp_context=None,
+        initializer: Callable[..., Any] | None = None,
+        initargs: tuple = (),
+        window: int = 1024,
+    ) -> None:
+        self.name = name
+        self.threads = max(1, threads)
+        self.processes = max(0, processes)
+        self._mp_context = mp_context
+        self._initializer = initializer
+        self._initargs = initargs
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix=f"lane-{name}"
+        )
+        self.process_executor = self._new_process_executor() if self.processes else None
+        self._lock = threading.Lock()
+        self._waits: collections.deque[float] = collections.deque(maxlen=window)
+        self.submitted = 0
+        self.completed = 0
+
+    def _new_process_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self._mp_context,
+            initializer=self._initializer,
+            initargs=self._initargs,
+        )
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        use_process: bool = False,
+        on_error: Callable[[BaseException], Any] | None = None,
+    ) -> concurrent.futures.Future:
+        """Run ``func`` on this lane.
+
+        ``on_error`` is called with the exception when the task fails without
+        reporting back itself, e.g. when its worker process is killed.
+        """
+        enqueued_at = time.time()
+        executor = None
+        if use_process and self.process_executor:
+            executor = self.process_executor
+            try:
+                inner = executor.submit(_timed_call, func, args, kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. a native crash); replace the pool and retry once
+                executor = self._replace_process_executor(executor)
+                inner = executor.submit(_timed_call, func, args, kwargs)
+        else:
+            inner = self.executor.submit(_timed_call, func, args, kwargs)
+        with self._lock:
+            self.submitted += 1
+
+        outer: concurrent.futures.Future = concurrent.futures.Future()
+
+        def _done(f: concurrent.futures.Future) -> None:
+            exc = f.exception()
+            with self._lock:
+                self.completed += 1
+            if exc is not None:
+                if executor is not None and isinstance(exc, BrokenProcessPool):
+                    # Don't leave the dead pool for the next job to trip over
+                    self._replace_process_executor(executor)
+                if on_error is not None:
+                    self._report(on_error, exc)
+                outer.set_exception(exc)
+                return
+            started_at, result = f.result()
+            with self._lock:
+                self._waits.append(max(0.0, started_at - enqueued_at))
+            outer.set_result(result)
+
+        inner.add_done_callback(_done)
+        return outer
+
+    def _replace_process_executor(self, broken: concurrent.futures.ProcessPoolExecutor) -> concurrent.futures.ProcessPoolExecutor:
+        # Every task of a broken pool fails at once; only the first one replaces it
+        with self._lock:
+            if self.process_executor is broken:
+                self.process_executor = self._new_process_executor()
+            current = self.process_executor
+        if current is not broken:
+            broken.shutdown(wait=False)
+        return current
+
+    def _report(self, on_error: Callable[[BaseException], Any], exc: BaseException) -> None:
+        # Done callbacks run on the pool's management thread; keep it free
+        try:
+            self.executor.submit(on_error, exc)
+        except RuntimeError:  # shutting down
+            try:
+                on_error(exc)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            in_flight = self.submitted - self.completed
+            completed = self.completed
+
+        def pct(q: float) -> float | None:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 4)
+
+        return {
+            "threads": self.threads,
+            "processes": self.processes,
+            "in_flight": in_flight,
+            "completed": completed,
+            "wait_seconds": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99), "max": round(waits[-1], 4) if waits else None},
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
+        if self.process_executor:
+            self.process_executor.shutdown(wait=wait)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from ..models.job import ACTIVE_STATUSES, ITEMS_DIRNAME
+from ..models.job_store import store_for
+
+TRASH_DIRNAME = ".trash"
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def mark_used(workspace: str) -> None:
+    # The workspace mtime doubles as "last used" for TTL and LRU eviction
+    try:
+        os.utime(workspace, None)
+    except OSError:
+        pass
+
+
+def trash_workspace(jobs_dir: str, job_id: str) -> bool:
+    """Move a workspace into the trash area; the sweeper deletes it later."""
+    if not job_id or job_id.startswith(".") or os.sep in job_id or (os.altsep and os.altsep in job_id):
+        return False
+    workspace = os.path.join(jobs_dir, job_id)
+    trash = os.path.join(jobs_dir, TRASH_DIRNAME)
+    os.makedirs(trash, exist_ok=True)
+    try:
+        # Same filesystem, so this is a constant-time rename
+        os.rename(workspace, os.path.join(trash, f"{job_id}-{uuid.uuid4().hex[:8]}"))
+    except FileNotFoundError:
+        return False
+    store_for(jobs_dir).delete(job_id)
+    return True
+
+
+class WorkspaceSweeper:
+    """Background thread that expires, evicts and reaps job workspaces."""
+
+    def __init__(self) -> None:
+        self.jobs_dir: str | None = None
+        self.ttl_seconds = 60 * 60
+        self.quota_bytes = 0
+        self.stale_seconds = 3 * 60 * 60
+        self.interval = 60.0
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "bytes_reclaimed": 0,
+            "workspaces_reaped": 0,
+            "workspaces_expired": 0,
+            "workspaces_evicted": 0,
+            "stale_jobs_failed": 0,
+            "usage_bytes": 0,
+            "last_sweep_at": None,
+        }
+
+    def init_app(self, app) -> None:
+        self.jobs_dir = app.config["JOBS_DIR"]
+        self.ttl_seconds = int(app.config.get("STORAGE_TTL_MINUTES", 60)) * 60
+        self.quota_bytes = int(app.config.get("STORAGE_QUOTA_BYTES", 0) or 0)
+        self.stale_seconds = int(app.config.get("STALE_JOB_MINUTES", 180) or 0) * 60
+        self.interval = float(app.config.get("SWEEP_INTERVAL_SECONDS", 60))
+        if app.config.get("SWEEPER_ENABLED", True) and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="workspace-sweeper", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                pass
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _bump(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, ttl_seconds=self.ttl_seconds, quota_bytes=self.quota_bytes)
+
+    def _last_activity(self, job_id: str, data: Dict[str, Any], now: float) -> float:
+        last = data.get("updated_at") or data.get("created_at") or now
+        # A batch parent is only written when an item finishes; items in
+        # progress show up as writes to their own workspaces
+        items = os.path.join(self.jobs_dir, job_id, ITEMS_DIRNAME)  # type: ignore[arg-type]
+        try:
+            entries = list(os.scandir(items))
+        except (FileNotFoundError, NotADirectoryError):
+            return last
+        for entry in entries:
+            try:
+                last = max(last, entry.stat(follow_symlinks=False).st_mtime)
+            except OSError:
+                pass
+        return last
+
+    def _is_active(self, job_id: str, now: float) -> bool:
+        try:
+            data = store_for(self.jobs_dir).get(job_id)  # type: ignore[arg-type]
+        except (OSError, ValueError):
+            return False
+        if data.get("status") not in ACTIVE_STATUSES:
+            return False
+        if self.stale_seconds and now - self._last_activity(job_id, data, now) > self.stale_seconds:
+            # Its worker is gone (crash, restart); fail it so the space can be reclaimed
+            from .jobs import fail_job
+
+            if fail_job(self.jobs_dir, job_id, f"Job made no progress for {self.stale_seconds // 60} minutes"):  # type: ignore[arg-type]
+                self._bump(stale_jobs_failed=1)
+            return False
+        return True
+
+    def _workspaces(self) -> List[Tuple[float, str]]:
+        out: List[Tuple[float, str]] = []
+        try:
+            entries = list(os.scandir(self.jobs_dir))  # type: ignore[arg-type]
+        except FileNotFoundError:
+            return out
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                out.append((entry.stat(follow_symlinks=False).st_mtime, entry.name))
+            except OSError:
+                pass
+        return out
+
+    def reap(self) -> None:
+        trash = os.path.join(self.jobs_dir, TRASH_DIRNAME)  # type: ignore[arg-type]
+        try:
+            names = os.listdir(trash)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(trash, name)
+            size = _tree_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            self._bump(bytes_reclaimed=size, workspaces_reaped=1)
+
+    def sweep(self) -> None:
+        if not self.jobs_dir:
+            return
+        now = time.time()
+        live: List[Tuple[float, str]] = []
+        for mtime, job_id in self._workspaces():
+            if self.ttl_seconds and now - mtime > self.ttl_seconds and not self._is_active(job_id, now):
+                if trash_workspace(self.jobs_dir, job_id):
+                    self._bump(workspaces_expired=1)
+                continue
+            live.append((mtime, job_id))
+
+        sizes = {job_id: _tree_size(os.path.join(self.jobs_dir, job_id)) for _, job_id in live}
+        usage = sum(sizes.values())
+        if self.quota_bytes and usage > self.quota_bytes:
+            # Least recently used first; downloads refresh the workspace mtime
+            for _mtime, job_id in sorted(live):
+                if usage <= self.quota_bytes:
+                    break
+                if self._is_active(job_id, now):
+                    continue
+                if trash_workspace(self.jobs_dir, job_id):
+                    usage -= sizes[job_id]
+                    self._bump(workspaces_evicted=1)
+
+        self.reap()
+        with self._lock:
+            self._stats["usage_bytes"] = usage
+            self._stats["last_sweep_at"] = now
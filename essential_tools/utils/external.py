@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+# Keep only the end of stderr; that is where the error usually is
+_STDERR_TAIL = 4000
+
+
+def _parse_limits(raw: str | None) -> Dict[str, int]:
+    # "gs=2,qpdf=4" -> {"gs": 2, "qpdf": 4}
+    limits: Dict[str, int] = {}
+    for part in (raw or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+_settings: Dict[str, Any] = {
+    "max_procs": int(os.getenv("EXTERNAL_MAX_PROCS", os.cpu_count() or 1)),
+    "tool_limits": _parse_limits(os.getenv("EXTERNAL_TOOL_LIMITS", "gs=2,qpdf=4,soffice=2")),
+    "timeout": float(os.getenv("EXTERNAL_TIMEOUT", 300)),
+    "memory_mb": int(os.getenv("EXTERNAL_MEMORY_LIMIT_MB", 0)),
+}
+_slots: Dict[str, "_Slots"] = {}
+_lock = threading.Lock()
+
+
+class ExternalToolError(RuntimeError):
+    def __init__(self, name: str, message: str, returncode: int | None = None, stderr: str = "") -> None:
+        self.name = name
+        self.returncode = returncode
+        self.stderr = stderr
+        detail = stderr.strip().splitlines()[-1] if stderr.strip() else ""
+        super().__init__(f"{name}: {message}" + (f" ({detail})" if detail else ""))
+
+
+class ExternalToolTimeout(ExternalToolError):
+    pass
+
+
+class _Slots:
+    """At most ``limit`` holders host-wide, via one flock()ed file per slot.
+
+    Locks are released by the kernel when a worker dies, so a crash never
+    leaks a slot. Without fcntl (Windows) the cap is per process.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.root = os.path.join(tempfile.gettempdir(), "essential_tools_slots", name)
+        self._local = threading.BoundedSemaphore(self.limit)
+        if fcntl is not None:
+            os.makedirs(self.root, exist_ok=True)
+
+    def acquire(self) -> Any:
+        self._local.acquire()
+        if fcntl is None:
+            return None
+        delay = 0.01
+        while True:
+            for i in range(self.limit):
+                fd = os.open(os.path.join(self.root, f"{i}.lock"), os.O_CREAT | os.O_RDWR, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except OSError:
+                    os.close(fd)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+    def release(self, token: Any) -> None:
+        if token is not None:
+            os.close(token)  # drops the flock
+        self._local.release()
+
+
+def _slots_for(name: str, limit: int) -> _Slots:
+    key = f"{name}:{limit}"
+    slots = _slots.get(key)
+    if slots is None:
+        with _lock:
+            slots = _slots.setdefault(key, _Slots(name, limit))
+    return slots
+
+
+def configure(
+    max_procs: int | None = None,
+    tool_limits: Dict[str, int] | str | None = None,
+    timeout: float | None = None,
+    memory_mb: int | None = None,
+) -> None:
+    with _lock:
+        if max_procs is not None:
+            _settings["max_procs"] = int(max_procs)
+        if tool_limits is not None:
+            _settings["tool_limits"] = _parse_limits(tool_limits) if isinstance(tool_limits, str) else dict(tool_limits)
+        if timeout is not None:
+            _settings["timeout"] = float(timeout)
+        if memory_mb is not None:
+            _settings["memory_mb"] = int(memory_mb)
+
+
+def _limit_memory(limit_bytes: int):
+    def _apply() -> None:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+    return _apply
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        if sys.platform != "win32":
+            # The tool may have forked helpers (soffice does); take the whole group
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:  # pragma: no cover
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run(
+    name: str,
+    cmd: Sequence[str],
+    timeout: float | None = None,
+    memory_mb: int | None = None,
+    jobs_dir: str | None = None,
+) -> subprocess.CompletedProcess:
+    """Run an external tool under the global and per-tool concurrency caps.
+
+    ``name`` selects the per-tool cap (e.g. "gs"). Raises ExternalToolTimeout
+    after ``timeout`` seconds (the process group is killed) and
+    ExternalToolError on a non-zero exit, both carrying the captured stderr.
+    Queue and run times are recorded when ``jobs_dir`` is given.
+    """
+    timeout = timeout or _settings["timeout"]
+    memory_mb = _settings["memory_mb"] if memory_mb is None else memory_mb
+    tool_limit = _settings["tool_limits"].get(name)
+
+    queued = time.perf_counter()
+    # Always per-tool first, then global, so two callers can't deadlock
+    held: List[tuple] = []
+    try:
+        if tool_limit:
+            slots = _slots_for(name, tool_limit)
+            held.append((slots, slots.acquire()))
+        slots = _slots_for("_all", _settings["max_procs"])
+        held.append((slots, slots.acquire()))
+        wait = time.perf_counter() - queued
+
+        started = time.perf_counter()
+        kwargs: Dict[str, Any] = {}
+        if sys.platform != "win32":
+            kwargs["start_new_session"] = True
+            if memory_mb:
+                kwargs["preexec_fn"] = _limit_memory(memory_mb * 1024 * 1024)
+        proc = subprocess.Popen(
+            list(cmd),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **kwargs,
+        )
+        outcome = "ok"
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            stdout, stderr = proc.communicate()
+            outcome = "timeout"
+        finally:
+            if proc.poll() is None:
+                _kill(proc)
+                proc.wait()
+        runtime = time.perf_counter() - started
+    finally:
+        for slots, token in reversed(held):
+            slots.release(token)
+
+    err_text = (stderr or b"")[-_STDERR_TAIL:].decode("utf-8", errors="replace")
+    if outcome == "ok" and proc.returncode != 0:
+        outcome = "error"
+    if jobs_dir:
+
+        def _write(m: metrics.MetricsStore) -> None:
+            m.observe("essential_tools_external_wait_seconds", wait, tool=name)
+            m.observe("essential_tools_external_run_seconds", runtime, tool=name)
+            m.inc("essential_tools_external_runs_total", tool=name, outcome=outcome)
+
+        metrics.record(jobs_dir, _write)
+    if outcome == "timeout":
+        raise ExternalToolTimeout(name, f"timed out after {timeout:g}s", proc.returncode, err_text)
+    if outcome == "error":
+        raise ExternalToolError(name, f"exited with status {proc.returncode}", proc.returncode, err_text)
+    return subprocess.CompletedProcess(list(cmd), proc.returncode, stdout, stderr)
+
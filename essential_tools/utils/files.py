@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import contextlib
 import os
 import shutil
 import tempfile
+import time
+import zipfile
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator, Tuple
 
 ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg", "gif", "tiff", "bmp", "doc", "docx", "ppt", "pptx"}
 
@@ -15,6 +18,9 @@ def allowed_file(filename: str, allowed: set[str] | None = None) -> bool:
 
 
 def save_uploads(workspace: str, files: Iterable, subdir: str = "uploads") -> list[str]:
+    from .metrics import record
+
+    started = time.perf_counter()
     out_dir = os.path.join(workspace, subdir)
     os.makedirs(out_dir, exist_ok=True)
     paths: list[str] = []
@@ -25,8 +31,22 @@ def save_uploads(workspace: str, files: Iterable, subdir: str = "uploads") -> li
             raise ValueError(f"Unsupported file type: {filename}")
         clean = secure_filename(filename)
         path = os.path.join(out_dir, clean)
+        # Keep same-named uploads apart (common in batches)
+        stem, ext = os.path.splitext(clean)
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(out_dir, f"{stem}-{n}{ext}")
+            n += 1
         f.save(path)
         paths.append(path)
+    elapsed = time.perf_counter() - started
+    size = sum(os.path.getsize(p) for p in paths)
+
+    def _write(m) -> None:
+        m.observe("essential_tools_stage_seconds", elapsed, stage="upload")
+        m.inc("essential_tools_upload_bytes_total", size)
+
+    record(os.path.dirname(workspace), _write)
     return paths
 
 
@@ -45,3 +65,202 @@ def clean_workspace(path: str) -> None:
 def temp_pdf_path(workspace: str, name: str) -> str:
     Path(workspace).mkdir(parents=True, exist_ok=True)
     return os.path.join(workspace, name)
+
+
+_IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".tiff", ".bmp"}
+
+
+def count_pages(path: str) -> int:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _IMAGE_EXTS:
+        return 1
+    if ext != ".pdf":
+        return 0
+    try:
+        import fitz  # type: ignore
+
+        # Opening only reads the xref/page tree, not page content
+        with fitz.open(path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def input_cost(paths: Iterable[str], max_bytes: int | None = None, max_pages: int | None = None) -> Tuple[int, int]:
+    """Total (bytes, pages) of the uploads; stops early once a limit is reached."""
+    paths = list(paths)
+    size = 0
+    for p in paths:
+        try:
+            size += os.path.getsize(p)
+        except OSError:
+            pass
+    if max_bytes is not None and size >= max_bytes:
+        return size, 0
+    pages = 0
+    for p in paths:
+        pages += count_pages(p)
+        if max_pages is not None and pages >= max_pages:
+            break
+    return size, pages
+
+
+# Suffix of an output that is still being written; renamed away when complete
+PARTIAL_SUFFIX = ".part"
+_FOLLOW_CHUNK = 64 * 1024
+_FOLLOW_POLL_SECONDS = 0.05
+_FOLLOW_RECHECK_SECONDS = 1.0
+
+
+class _AppendOnly:
+    """File wrapper that hides seek(), so ZipFile writes strictly forward.
+
+    ZipFile then uses data descriptors instead of patching local headers,
+    which means every byte on disk is final as soon as it is written.
+    """
+
+    def __init__(self, raw) -> None:
+        self._raw = raw
+        self._pos = 0
+
+    def write(self, data) -> int:
+        n = self._raw.write(data)
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, *args):
+        raise OSError("append-only")
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+
+@contextlib.contextmanager
+def streaming_zip(path: str, compression: int = zipfile.ZIP_STORED) -> Iterator[zipfile.ZipFile]:
+    """Write a ZIP at ``path + PARTIAL_SUFFIX`` that readers can follow while it grows.
+
+    The archive is renamed to ``path`` once closed, and removed on error.
+    """
+    part = path + PARTIAL_SUFFIX
+    try:
+        with open(part, "wb") as raw:
+            out = _AppendOnly(raw)
+            with zipfile.ZipFile(out, "w", compression=compression) as zf:
+                yield zf
+            out.flush()
+        os.replace(part, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(part)
+        raise
+
+
+# ioctl request for a copy-on-write clone of a whole file (Linux)
+_FICLONE = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> None:
+    """Copy ``src`` to ``dst``, as a copy-on-write clone where the filesystem supports it."""
+    try:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+
+
+@contextlib.contextmanager
+def edit_pdf(src: str, out_path: str, incremental: bool = False) -> Iterator:
+    """Open ``src`` with PyMuPDF for editing; the result is written to ``out_path``.
+
+    With ``incremental``, ``out_path`` starts as a copy of ``src`` (a clone on
+    copy-on-write filesystems) and saving appends only the changed objects
+    (a PDF incremental update), so the cost follows the edits rather than
+    the document size. Documents that cannot be updated in place (e.g.
+    repaired on open) get a full save.
+    """
+    import fitz  # type: ignore
+
+    doc = None
+    if incremental:
+        _clone_file(src, out_path)
+        doc = fitz.open(out_path)
+        if not doc.can_save_incrementally():
+            doc.close()
+            os.remove(out_path)
+            doc = None
+    if doc is None:
+        incremental = False
+        doc = fitz.open(src)
+    try:
+        yield doc
+        # deflate compresses new streams (e.g. an inserted image's pixels);
+        # streams that are already compressed are copied as they are
+        if incremental:
+            doc.save(out_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+        else:
+            doc.save(out_path, deflate=True)
+    except BaseException:
+        doc.close()
+        doc = None
+        with contextlib.suppress(OSError):
+            os.remove(out_path)
+        raise
+    finally:
+        if doc is not None:
+            doc.close()
+
+
+def follow_file(path: str, finished: Callable[[], bool]) -> Iterator[bytes]:
+    """Yield the bytes of ``path``, following its ``.part`` file while it is still written.
+
+    ``finished()`` reports whether the writer is gone (job done or failed).
+    It is polled while waiting, so a queued job is waited for and a crashed
+    writer does not keep the reader hanging.
+    """
+    part: str | None = path + PARTIAL_SUFFIX
+    idle = 0.0
+    while True:
+        try:
+            f = open(part, "rb")
+            break
+        except FileNotFoundError:
+            pass
+        if os.path.exists(path):
+            f = open(path, "rb")
+            part = None
+            break
+        time.sleep(_FOLLOW_POLL_SECONDS)
+        idle += _FOLLOW_POLL_SECONDS
+        if idle >= _FOLLOW_RECHECK_SECONDS:
+            idle = 0.0
+            if finished() and not os.path.exists(path):
+                return
+    with f:
+        idle = 0.0
+        while True:
+            chunk = f.read(_FOLLOW_CHUNK)
+            if chunk:
+                idle = 0.0
+                yield chunk
+                continue
+            if part is None:
+                return
+            if not os.path.exists(part):
+                # Renamed (complete) or removed (failed): nothing more will be written
+                rest = f.read()
+                if rest:
+                    yield rest
+                return
+            time.sleep(_FOLLOW_POLL_SECONDS)
+            idle += _FOLLOW_POLL_SECONDS
+            if idle >= _FOLLOW_RECHECK_SECONDS:
+                idle = 0.0
+                if finished() and os.path.exists(part):
+                    return
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from . import external
+
+# Export filter per input type; anything else is opened by Writer
+_FILTERS = {
+    ".ppt": "impress_pdf_Export",
+    ".pptx": "impress_pdf_Export",
+    ".odp": "impress_pdf_Export",
+    ".pps": "impress_pdf_Export",
+    ".ppsx": "impress_pdf_Export",
+}
+_WRITER_FILTER = "writer_pdf_Export"
+
+_settings: Dict[str, Any] = {
+    "size": int(os.getenv("LIBREOFFICE_POOL_SIZE", 2)),
+    "timeout": float(os.getenv("LIBREOFFICE_TIMEOUT", 120)),
+    "max_conversions": int(os.getenv("LIBREOFFICE_MAX_CONVERSIONS", 200)),
+}
+_pool: Optional["LibreOfficePool"] = None
+_lock = threading.Lock()
+
+
+class ConversionTimeout(RuntimeError):
+    pass
+
+
+def find_executable() -> str | None:
+    for name in ("soffice", "soffice.bin"):
+        p = shutil.which(name)
+        if p:
+            return p
+    return None
+
+
+def _uno_paths() -> List[str]:
+    # Where LibreOffice / python3-uno put uno.py; only usable when built for this Python
+    paths = [p for p in os.getenv("LIBREOFFICE_UNO_PATH", "").split(os.pathsep) if p]
+    exe = find_executable()
+    if exe:
+        paths.append(os.path.dirname(os.path.realpath(exe)))
+    paths.append("/usr/lib/python3/dist-packages")
+    return [p for p in paths if os.path.isfile(os.path.join(p, "uno.py"))]
+
+
+@lru_cache(maxsize=None)
+def _uno():
+    # The UNO bridge ships with LibreOffice, not on PyPI; without it every
+    # conversion is a one-shot `soffice --convert-to` on the slot's own profile.
+    try:
+        import uno  # type: ignore
+
+        return uno
+    except Exception:
+        pass
+    for path in _uno_paths():
+        if path in sys.path:
+            continue
+        sys.path.append(path)  # last, so it never shadows installed packages
+        try:
+            import uno  # type: ignore
+
+            return uno
+        except Exception:
+            sys.path.remove(path)
+    return None
+
+
+def _props(**values: Any) -> tuple:
+    from com.sun.star.beans import PropertyValue  # type: ignore
+
+    return tuple(PropertyValue(Name=k, Value=v) for k, v in values.items())
+
+
+class _Instance:
+    """One headless LibreOffice with its own profile, listening on a named pipe."""
+
+    def __init__(self, exe: str, profile: str) -> None:
+        self.exe = exe
+        self.profile = profile
+        self.pipe = f"essential-tools-{uuid.uuid4().hex[:12]}"
+        self.proc: subprocess.Popen | None = None
+        self.desktop = None
+        self.conversions = 0
+
+    def _profile_url(self) -> str:
+        return "file://" + os.path.abspath(self.profile).replace(os.sep, "/")
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self, uno, timeout: float = 30.0) -> None:
+        os.makedirs(self.profile, exist_ok=True)
+        self.proc = subprocess.Popen(
+            [
+                self.exe,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={self._profile_url()}",
+                f"--accept=pipe,name={self.pipe};urp;StarOffice.ComponentContext",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if not self.alive() or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.1)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        self.conversions = 0
+
+    def stop(self) -> None:
+        self.desktop = None
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            self.proc.kill()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+        self.proc = None
+
+    def convert(self, uno, inp: str, out_path: str) -> None:
+        ext = os.path.splitext(inp)[1].lower()
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(inp)), "_blank", 0, _props(Hidden=True, ReadOnly=True)
+        )
+        if doc is None:
+            raise RuntimeError("LibreOffice could not open the document")
+        try:
+            doc.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(out_path)),
+                _props(FilterName=_FILTERS.get(ext, _WRITER_FILTER)),
+            )
+        finally:
+            try:
+                doc.close(True)
+            except Exception:
+                pass
+
+
+class LibreOfficePool:
+    """Long-lived LibreOffice instances shared by every conversion in this process.
+
+    Instances start lazily, are restarted when they crash or exceed the
+    per-conversion timeout, and are recycled after ``max_conversions``.
+    """
+
+    def __init__(self, exe: str, size: int = 2, timeout: float = 120.0, max_conversions: int = 200) -> None:
+        self.exe = exe
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_conversions = max(1, max_conversions)
+        self.pid = os.getpid()
+        self.root = os.path.join(tempfile.gettempdir(), "essential_tools_libreoffice", str(self.pid))
+        self._idle: "queue.Queue[_Instance]" = queue.Queue()
+        self._instances: List[_Instance] = []
+        for slot in range(self.size):
+            inst = _Instance(exe, os.path.join(self.root, f"profile-{slot}"))
+            self._instances.append(inst)
+            self._idle.put(inst)
+        self.restarts = 0
+
+    def convert(
+        self, inp: str, out_dir: str, timeout: float | None = None, jobs_dir: str | None = None
+    ) -> str:
+        timeout = timeout or self.timeout
+        out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(inp))[0] + ".pdf")
+        try:
+            inst = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ConversionTimeout("No LibreOffice instance became free in time") from None
+        try:
+            uno = _uno()
+            if uno is None:
+                self._convert_cli(inst, inp, out_dir, timeout, jobs_dir)
+            else:
+                self._convert_uno(uno, inst, inp, out_path, timeout)
+        finally:
+            self._idle.put(inst)
+        if not os.path.exists(out_path):
+            raise RuntimeError("LibreOffice produced no output")
+        return out_path
+
+    def _convert_uno(self, uno, inst: _Instance, inp: str, out_path: str, timeout: float) -> None:
+        if not inst.alive() or inst.desktop is None:
+            if inst.proc is not None:
+                self.restarts += 1
+            inst.stop()
+            inst.start(uno)
+        outcome: Dict[str, BaseException | None] = {"error": None}
+
+        def _run() -> None:
+            try:
+                inst.convert(uno, inp, out_path)
+            except BaseException as e:  # re-raised in the caller
+                outcome["error"] = e
+
+        worker = threading.Thread(target=_run, name="libreoffice-convert", daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            # Killing the office process makes the blocked UNO call fail and returns the thread
+            inst.stop()
+            self.restarts += 1
+            raise ConversionTimeout(f"LibreOffice conversion timed out after {timeout:g}s")
+        if outcome["error"] is not None:
+            if not inst.alive():
+                inst.stop()
+                shutil.rmtree(inst.profile, ignore_errors=True)  # don't reuse a profile from a crash
+            raise RuntimeError(f"LibreOffice conversion failed: {outcome['error']}")
+        inst.conversions += 1
+        if inst.conversions >= self.max_conversions:
+            inst.stop()  # restarted on next use
+
+    def _convert_cli(
+        self, inst: _Instance, inp: str, out_dir: str, timeout: float, jobs_dir: str | None
+    ) -> None:
+        # Still one process per document, but never two on the same profile
+        os.makedirs(inst.profile, exist_ok=True)
+        cmd = [
+            self.exe,
+            "--headless",
+            "--nologo",
+            "--norestore",
+            f"-env:UserInstallation={inst._profile_url()}",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            out_dir,
+            inp,
+        ]
+        try:
+            external.run("soffice", cmd, timeout=timeout, jobs_dir=jobs_dir)
+        except external.ExternalToolTimeout:
+            raise ConversionTimeout(f"LibreOffice conversion timed out after {timeout:g}s") from None
+        inst.conversions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "mode": "uno" if _uno() is not None else "cli",
+            "running": sum(1 for i in self._instances if i.alive()),
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "conversions": sum(i.conversions for i in self._instances),
+        }
+
+    def shutdown(self) -> None:
+        for inst in self._instances:
+            inst.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def configure(size: int | None = None, timeout: float | None = None, max_conversions: int | None = None) -> None:
+    global _pool
+    with _lock:
+        if size is not None:
+            _settings["size"] = int(size)
+        if timeout is not None:
+            _settings["timeout"] = float(timeout)
+        if max_conversions is not None:
+            _settings["max_conversions"] = int(max_conversions)
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def get_pool() -> Optional[LibreOfficePool]:
+    """The process-wide pool, or None when LibreOffice is not installed."""
+    global _pool
+    # A pool inherited through fork() belongs to the parent's instances
+    if _pool is None or _pool.pid != os.getpid():
+        with _lock:
+            if _pool is None or _pool.pid != os.getpid():
+                exe = find_executable()
+                if not exe:
+                    return None
+                _pool = LibreOfficePool(exe, **_settings)
+    return _pool
+
+
+def pool_stats() -> Optional[Dict[str, Any]]:
+    # Only for a pool this process already started
+    return _pool.stats() if _pool is not None else None
+
+
+def convert(inp: str, out_dir: str, timeout: float | None = None, jobs_dir: str | None = None) -> str:
+    pool = get_pool()
+    if pool is None:
+        raise FileNotFoundError("LibreOffice (soffice) not found")
+    return pool.convert(inp, out_dir, timeout=timeout, jobs_dir=jobs_dir)
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.shutdown()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .files import input_cost
+
+# name -> (type, help); every series written or rendered must be declared here
+METRICS: Dict[str, Tuple[str, str]] = {
+    "essential_tools_jobs": ("gauge", "Jobs in the job store by tool and status."),
+    "essential_tools_jobs_finished_total": ("counter", "Jobs that reached a final status."),
+    "essential_tools_job_queue_wait_seconds": ("histogram", "Time from job creation to start of processing."),
+    "essential_tools_processor_wall_seconds": ("histogram", "Wall time spent inside a tool processor."),
+    "essential_tools_processor_cpu_seconds": ("histogram", "CPU time of the worker thread inside a tool processor."),
+    "essential_tools_stage_seconds": ("histogram", "Wall time of request and job stages outside the processor."),
+    "essential_tools_input_bytes_total": ("counter", "Bytes of input handed to processors."),
+    "essential_tools_output_bytes_total": ("counter", "Bytes of output produced by processors."),
+    "essential_tools_pages_processed_total": ("counter", "Input pages (PDF pages or images) handed to processors."),
+    "essential_tools_upload_bytes_total": ("counter", "Bytes received by save_uploads."),
+    "essential_tools_download_bytes_total": ("counter", "Bytes served by the download route."),
+    "essential_tools_lane_in_flight": ("gauge", "Jobs submitted to a lane and not yet finished."),
+    "essential_tools_lane_workers": ("gauge", "Worker budget of a lane by pool."),
+    "essential_tools_result_cache_events_total": ("counter", "Result cache hits, misses and evictions."),
+    "essential_tools_page_cache_events_total": ("counter", "Rendered-page cache hits by tier, misses and evictions."),
+    "essential_tools_page_cache_saved_bytes_total": ("counter", "Encoded page bytes served from the page cache instead of rendered."),
+    "essential_tools_libreoffice_instances_running": ("gauge", "Resident LibreOffice instances in this process by mode (uno, cli)."),
+    "essential_tools_libreoffice_restarts_total": ("counter", "LibreOffice instances restarted after a crash or timeout."),
+    "essential_tools_storage_reclaimed_bytes_total": ("counter", "Bytes freed by the workspace sweeper."),
+    "essential_tools_storage_usage_bytes": ("gauge", "Bytes held by job workspaces at the last sweep."),
+    "essential_tools_external_wait_seconds": ("histogram", "Time an external tool waited for a concurrency slot."),
+    "essential_tools_external_run_seconds": ("histogram", "Wall time of external tool processes."),
+    "essential_tools_external_runs_total": ("counter", "External tool runs by outcome (ok, error, timeout)."),
+}
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: Any) -> str:
+    # Label value escaping of the Prometheus text format
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()) if v is not None)
+
+
+class MetricsStore:
+    """Counters and histograms in a SQLite file so every worker process adds to the same series."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL,"
+            " PRIMARY KEY (name, labels)) WITHOUT ROWID"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _add(self, rows: Iterable[Tuple[str, str, float]]) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO samples (name, labels, value) VALUES (?, ?, ?)"
+                " ON CONFLICT(name, labels) DO UPDATE SET value = value + excluded.value",
+                list(rows),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        self._add([(name, format_labels(labels), value)])
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> None:
+        base = format_labels(labels)
+        sep = "," if base else ""
+        rows = [(f"{name}_bucket", f'{base}{sep}le="{le}"', 1.0) for le in buckets if value <= le]
+        rows.append((f"{name}_bucket", f'{base}{sep}le="+Inf"', 1.0))
+        rows.append((f"{name}_sum", base, value))
+        rows.append((f"{name}_count", base, 1.0))
+        self._add(rows)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return self._conn().execute("SELECT name, labels, value FROM samples ORDER BY name, labels").fetchall()
+
+
+# observe() always appends le last
+_LE = re.compile(r'(?:^|,)le="([^"]*)"$')
+
+
+def _sample_order(sample: Tuple[str, str, float]) -> tuple:
+    # Histogram buckets by their numeric bound (+Inf last), not as strings
+    name, labels, _value = sample
+    match = _LE.search(labels) if name.endswith("_bucket") else None
+    if match is None:
+        return (name, labels, 0.0)
+    return (name, _LE.sub("", labels, count=1), float(match.group(1)))
+
+
+def render(samples: Iterable[Tuple[str, str, float]]) -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    by_metric: Dict[str, List[str]] = {}
+    for name, labels, value in sorted(samples, key=_sample_order):
+        base = name
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[: -len(suffix)] in METRICS:
+                base = name[: -len(suffix)]
+        line = f"{name}{{{labels}}} {value:g}" if labels else f"{name} {value:g}"
+        by_metric.setdefault(base, []).append(line)
+    out: List[str] = []
+    for base in sorted(by_metric):
+        kind, help_text = METRICS.get(base, ("untyped", ""))
+        out.append(f"# HELP {base} {help_text}")
+        out.append(f"# TYPE {base} {kind}")
+        out.extend(by_metric[base])
+    return "\n".join(out) + "\n"
+
+
+_enabled = os.getenv("METRICS_ENABLED", "true").lower() in {"1", "true", "yes", "y"}
+_stores: Dict[str, MetricsStore] = {}
+_lock = threading.Lock()
+
+
+def configure(enabled: bool = True) -> None:
+    global _enabled
+    with _lock:
+        _enabled = bool(enabled)
+        _stores.clear()
+
+
+def metrics_for(jobs_dir: str) -> MetricsStore | None:
+    if not _enabled:
+        return None
+    path = os.path.join(os.path.abspath(jobs_dir), ".metrics.sqlite3")
+    store = _stores.get(path)
+    if store is None:
+        with _lock:
+            store = _stores.get(path)
+            if store is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                store = MetricsStore(path)
+                _stores[path] = store
+    return store
+
+
+def record(jobs_dir: str, fn: Callable[[MetricsStore], None]) -> None:
+    # Metrics are best-effort; a locked or missing database must never fail a job
+    store = metrics_for(jobs_dir)
+    if store is None:
+        return
+    try:
+        fn(store)
+    except Exception:
+        pass
+
+
+def instrument(slug: str, processor: Callable) -> Callable:
+    """Wrap ``process(job, upload_paths)`` to record timings and byte/page counts."""
+
+    @functools.wraps(processor)
+    def wrapper(job, upload_paths):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        result = processor(job, upload_paths)
+        wall = time.perf_counter() - wall
+        cpu = time.thread_time() - cpu
+
+        def _write(m: MetricsStore) -> None:
+            in_bytes, pages = input_cost(upload_paths)
+            out_bytes = sum(os.path.getsize(p) for p in (result or {}).get("files", []) if os.path.exists(p))
+            m.observe("essential_tools_processor_wall_seconds", wall, tool=slug)
+            m.observe("essential_tools_processor_cpu_seconds", cpu, tool=slug)
+            m.inc("essential_tools_input_bytes_total", in_bytes, tool=slug)
+            m.inc("essential_tools_output_bytes_total", out_bytes, tool=slug)
+            m.inc("essential_tools_pages_processed_total", pages, tool=slug)
+
+        if job.workspace_path:
+            record(job.jobs_dir, _write)
+        return result
+
+    return wrapper
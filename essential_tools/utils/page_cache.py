@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when a rendering change makes previously cached pages stale
+CACHE_VERSION = 1
+
+
+def page_key(doc_hash: str, index: int, spec) -> str:
+    """Key for page ``index`` of a document rendered with ``spec`` (a raster.RenderSpec).
+
+    ``spec`` must name a concrete format (see raster.resolve_spec), so that
+    an "auto" render and an explicit one of the same image share an entry.
+    """
+    if spec.format == "auto":
+        raise ValueError("Resolve the page format before building its cache key")
+    # Quality only matters to lossy encoders
+    quality = spec.quality if spec.format != "png" else 0
+    raw = f"v{CACHE_VERSION}\0{doc_hash}\0{index}\0{spec.dpi}\0{spec.colorspace}\0{spec.format}\0{quality}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class PageCache:
+    """Rendered page images: an on-disk LRU under ``root`` plus an in-memory hot tier.
+
+    The disk tier is shared by every process using ``root``; the memory tier
+    is per process and holds at most ``memory_bytes`` of recently used pages.
+    """
+
+    def __init__(self, root: str, max_bytes: int, memory_bytes: int = 0) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory: "collections.OrderedDict[str, Tuple[str, bytes]]" = collections.OrderedDict()
+        self._memory_size = 0
+        self._memory_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(root, exist_ok=True)
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_pages_last_used ON pages (last_used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        self._conn().execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+            (name, delta, delta),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _remember(self, key: str, value: Tuple[str, bytes]) -> None:
+        if len(value[1]) > self.memory_bytes:
+            return
+        with self._memory_lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old[1])
+            self._memory[key] = value
+            self._memory_size += len(value[1])
+            while self._memory_size > self.memory_bytes:
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_size -= len(dropped[1])
+
+    def contains(self, key: str) -> bool:
+        """Cheap presence check; a False answer counts as a miss (the caller renders)."""
+        if key in self._memory:
+            return True
+        found = self._conn().execute("SELECT 1 FROM pages WHERE key = ?", (key,)).fetchone() is not None
+        if not found:
+            self._count("misses")
+        return found
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(extension, encoded image) for ``key``, or None on a miss."""
+        with self._memory_lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        conn = self._conn()
+        if value is not None:
+            self._count("memory_hits")
+        else:
+            row = conn.execute("SELECT ext FROM pages WHERE key = ?", (key,)).fetchone()
+            try:
+                if row is None:
+                    raise FileNotFoundError(key)
+                with open(self._path(key), "rb") as f:
+                    value = (row[0], f.read())
+            except OSError:
+                # Never stored, or evicted by another process in between
+                self._count("misses")
+                return None
+            self._count("disk_hits")
+            self._remember(key, value)
+        conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._count("bytes_saved", len(value[1]))
+        return value
+
+    def put(self, key: str, ext: str, data: bytes) -> None:
+        self._remember(key, (ext, data))
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO pages (key, ext, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, ext, len(data), time.time()),
+        )
+        self._count("stores")
+        self.evict()
+
+    def evict(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            total -= size
+            self._count("evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        hits = counters.get("memory_hits", 0) + counters.get("disk_hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "hits": hits,
+            "memory_hits": counters.get("memory_hits", 0),
+            "disk_hits": counters.get("disk_hits", 0),
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "bytes_saved": counters.get("bytes_saved", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+
+_settings: Dict[str, Any] = {
+    "enabled": os.getenv("PAGE_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"},
+    "max_bytes": int(os.getenv("PAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    "memory_bytes": int(os.getenv("PAGE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024)),
+    # Namespaces other than "pages" are switched on and off on their own
+    "namespaces": {"signatures": os.getenv("SIGNATURE_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"}},
+}
+_caches: Dict[str, PageCache] = {}
+_lock = threading.Lock()
+
+
+def configure(
+    enabled: bool = True,
+    max_bytes: int = 512 * 1024 * 1024,
+    memory_bytes: int = 64 * 1024 * 1024,
+    signatures: bool = True,
+) -> None:
+    with _lock:
+        _settings.update(enabled=bool(enabled), max_bytes=int(max_bytes), memory_bytes=int(memory_bytes))
+        _settings["namespaces"] = {"signatures": bool(signatures)}
+        _caches.clear()
+
+
+def cache_for(jobs_dir: str, namespace: str = "pages") -> Optional[PageCache]:
+    """The page cache for ``jobs_dir`` or None when disabled.
+
+    Other small derived images (e.g. prepared signatures) use their own
+    ``namespace`` so they neither evict nor skew the page statistics. A
+    namespace has its own on/off switch; unknown ones follow "pages".
+    """
+    if not _settings["namespaces"].get(namespace, _settings["enabled"]):
+        return None
+    root = os.path.join(os.path.abspath(jobs_dir), ".cache", namespace)
+    cache = _caches.get(root)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(root)
+            if cache is None:
+                cache = PageCache(root, _settings["max_bytes"], _settings["memory_bytes"])
+                _caches[root] = cache
+    return cache
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+_settings: Dict[str, Any] = {
+    "workers": int(os.getenv("PARALLEL_WORKERS", 0)),  # 0 = this process's share of the CPUs
+    "start_method": os.getenv("PROCESS_START_METHOD", "spawn"),
+    # Processes on this host that may fan out at the same time (the lane
+    # worker processes); each gets cpu_count // share workers by default
+    "share": 1,
+}
+_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_executor_pid: int | None = None
+_lock = threading.Lock()
+
+
+def configure(workers: int | None = None, start_method: str | None = None, share: int | None = None) -> None:
+    global _executor
+    with _lock:
+        if workers is not None:
+            _settings["workers"] = int(workers)
+        if start_method:
+            _settings["start_method"] = start_method
+        if share is not None:
+            _settings["share"] = max(1, int(share))
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def workers() -> int:
+    """Pool size for one job's fan-out; 1 means work runs inline."""
+    return _settings["workers"] or max(1, (os.cpu_count() or 1) // _settings["share"])
+
+
+def _get_executor() -> concurrent.futures.ProcessPoolExecutor:
+    global _executor, _executor_pid
+    with _lock:
+        # Never reuse a pool inherited through fork()
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers(),
+                mp_context=multiprocessing.get_context(_settings["start_method"] or None),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shards(count: int, parts: int) -> List[range]:
+    """Split ``range(count)`` into at most ``parts`` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, count))
+    size, extra = divmod(count, parts)
+    out, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        out.append(range(start, end))
+        start = end
+    return [r for r in out if len(r)]
+
+
+def imap_sharded(fn: Callable[..., Any], tasks: Sequence[tuple], window: int | None = None) -> Iterator[Any]:
+    """Yield ``fn(*t)`` for each task, in task order, as soon as each is ready.
+
+    At most ``window`` tasks (default: two per worker) are in flight, so
+    results are consumed while later tasks still run. Runs inline when there
+    is a single task or a single worker, and finishes inline if the pool has
+    broken (e.g. a worker was OOM-killed).
+    """
+    if len(tasks) <= 1 or workers() <= 1:
+        for t in tasks:
+            yield fn(*t)
+        return
+    window = max(1, window or 2 * workers())
+    pending: Deque[concurrent.futures.Future] = collections.deque()
+    done = 0
+    try:
+        executor = _get_executor()
+        for t in tasks[:window]:
+            pending.append(executor.submit(fn, *t))
+        while pending:
+            result = pending.popleft().result()
+            if done + len(pending) + 1 < len(tasks):
+                pending.append(executor.submit(fn, *tasks[done + len(pending) + 1]))
+            done += 1
+            yield result
+    except BrokenProcessPool:
+        configure()
+        for t in tasks[done:]:
+            yield fn(*t)
+    finally:
+        for f in pending:
+            f.cancel()
+
+
+def run_sharded(fn: Callable[..., Any], tasks: Sequence[tuple]) -> List[Any]:
+    """``[fn(*t) for t in tasks]`` on the shared process pool, results in task order."""
+    return list(imap_sharded(fn, tasks, window=len(tasks)))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import dataclasses
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+FORMATS = ("png", "jpeg", "webp")
+COLORSPACES = ("rgb", "gray")
+# Pages at least this much covered by raster images count as photographic
+_PHOTO_COVERAGE = 0.5
+
+
+def webp_supported() -> bool:
+    try:
+        from PIL import features  # type: ignore
+
+        return bool(features.check("webp"))
+    except Exception:
+        return False
+
+
+@dataclass(frozen=True)
+class RenderSpec:
+    dpi: int = 150
+    format: str = "png"  # one of FORMATS, or "auto"
+    quality: int = 85  # JPEG/WebP only
+    colorspace: str = "rgb"
+
+    @property
+    def zoom(self) -> float:
+        return self.dpi / 72.0
+
+
+def parse_spec(options: Dict[str, Any], default_format: str = "png", formats: Tuple[str, ...] = FORMATS) -> RenderSpec:
+    """Read dpi/format/quality/colorspace job options; raises ValueError on bad values."""
+    fmt = str(options.get("format") or default_format).lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt != "auto" and fmt not in formats:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    if fmt == "webp" and not webp_supported():
+        raise ValueError("WebP output is not available (Pillow was built without WebP)")
+    colorspace = str(options.get("colorspace") or "rgb").lower()
+    if colorspace not in COLORSPACES:
+        raise ValueError(f"Unsupported colorspace: {colorspace}")
+    quality = min(max(int(options.get("quality", 85)), 1), 100)
+    # Tools never render below 72 DPI; only thumbnails go lower
+    dpi = max(72, int(options.get("dpi", 150)))
+    return RenderSpec(dpi=dpi, format=fmt, quality=quality, colorspace=colorspace)
+
+
+def _image_coverage(page) -> float:
+    area = abs(page.rect) or 1.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(page.rect & info["bbox"])
+    return min(covered / area, 1.0)
+
+
+def resolve_format(page, spec: RenderSpec) -> str:
+    """The concrete format for ``page``: "auto" picks JPEG for scans/photos and PNG for line art."""
+    if spec.format != "auto":
+        return spec.format
+    return "jpeg" if _image_coverage(page) >= _PHOTO_COVERAGE else "png"
+
+
+def resolve_spec(page, spec: RenderSpec) -> RenderSpec:
+    """``spec`` with "auto" replaced by the concrete format for ``page``."""
+    fmt = resolve_format(page, spec)
+    return spec if fmt == spec.format else dataclasses.replace(spec, format=fmt)
+
+
+def encode(pix, fmt: str, quality: int = 85) -> bytes:
+    if fmt == "png":
+        return pix.tobytes("png")
+    if fmt == "jpeg":
+        return pix.tobytes("jpeg", jpg_quality=quality)
+    if fmt == "webp":
+        from PIL import Image  # type: ignore
+
+        mode = "L" if pix.n == 1 else "RGB"
+        buf = io.BytesIO()
+        Image.frombytes(mode, (pix.width, pix.height), pix.samples).save(buf, format="WEBP", quality=quality, method=4)
+        return buf.getvalue()
+    raise ValueError(f"Unsupported image format: {fmt}")
+
+
+def render_page(page, spec: RenderSpec) -> Tuple[str, bytes]:
+    """Rasterize ``page``; returns (file extension without dot, encoded bytes)."""
+    import fitz  # PyMuPDF
+
+    fmt = resolve_format(page, spec)
+    cs = fitz.csGRAY if spec.colorspace == "gray" else fitz.csRGB
+    pix = page.get_pixmap(matrix=fitz.Matrix(spec.zoom, spec.zoom), colorspace=cs, alpha=False)
+    return ("jpg" if fmt == "jpeg" else fmt), encode(pix, fmt, spec.quality)
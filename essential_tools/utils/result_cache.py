@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+# Bump when a processor change makes previously cached outputs stale
+CACHE_VERSION = 1
+_JOB_PLACEHOLDER = "{job}"
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(tool: str, options: Dict[str, Any], upload_paths: Iterable[str]) -> str:
+    h = hashlib.sha256(f"v{CACHE_VERSION}\0{tool}\0".encode())
+    h.update(json.dumps(options or {}, sort_keys=True, separators=(",", ":"), default=str).encode())
+    for path in upload_paths:
+        # Processors look at extensions, never at the original file name
+        ext = os.path.splitext(path)[1].lower()
+        h.update(f"\0{ext}\0{file_sha256(path)}".encode())
+    return h.hexdigest()
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Different filesystem or no hard-link support
+        shutil.copyfile(src, dst)
+
+
+class ResultCache:
+    """Content-addressed store of tool outputs under ``root`` with an LRU index."""
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(root, exist_ok=True)
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                files TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        self._conn().execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+            (name, delta, delta),
+        )
+
+    def fetch(self, key: str, job_id: str, workspace: str) -> Optional[List[str]]:
+        """Link a cached result into ``workspace``; None on a miss."""
+        conn = self._conn()
+        row = conn.execute("SELECT files, size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        names = json.loads(row[0])
+        entry_dir = os.path.join(self.root, key)
+        out: List[str] = []
+        try:
+            for idx, name in enumerate(names):
+                dst = os.path.join(workspace, name.replace(_JOB_PLACEHOLDER, job_id))
+                link_or_copy(os.path.join(entry_dir, str(idx)), dst)
+                out.append(dst)
+        except OSError:
+            # Entry vanished underneath us (evicted by another worker)
+            for p in out:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            self._count("misses")
+            return None
+        conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        self._count("bytes_saved", row[1])
+        return out
+
+    def store(self, key: str, job_id: str, files: List[str]) -> None:
+        if not files:
+            return
+        entry_dir = os.path.join(self.root, key)
+        tmp_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        names: List[str] = []
+        size = 0
+        try:
+            for idx, path in enumerate(files):
+                link_or_copy(path, os.path.join(tmp_dir, str(idx)))
+                names.append(os.path.basename(path).replace(job_id, _JOB_PLACEHOLDER))
+                size += os.path.getsize(path)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Lost a race with another worker storing the same key
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, files, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(names), size, time.time()),
+        )
+        self._count("stores")
+        self.evict()
+
+    def evict(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+            total -= size
+            self._count("evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "bytes_saved": counters.get("bytes_saved", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+
+_settings: Dict[str, Any] = {
+    "enabled": os.getenv("RESULT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "y"},
+    "max_bytes": int(os.getenv("RESULT_CACHE_MAX_BYTES", 1024 * 1024 * 1024)),
+    "exclude": {t.strip() for t in os.getenv("RESULT_CACHE_EXCLUDE", "").split(",") if t.strip()},
+}
+_caches: Dict[str, ResultCache] = {}
+_lock = threading.Lock()
+
+
+def configure(enabled: bool = True, max_bytes: int = 1024 * 1024 * 1024, exclude: Iterable[str] = ()) -> None:
+    with _lock:
+        _settings.update(enabled=bool(enabled), max_bytes=int(max_bytes), exclude=set(exclude or ()))
+        _caches.clear()
+
+
+def cache_for(jobs_dir: str, tool: Any = None) -> Optional[ResultCache]:
+    """The cache for ``jobs_dir`` or None when disabled (globally or for ``tool``)."""
+    if not _settings["enabled"]:
+        return None
+    if tool is not None and (not getattr(tool, "cacheable", True) or tool.slug in _settings["exclude"]):
+        return None
+    root = os.path.join(os.path.abspath(jobs_dir), ".cache", "results")
+    cache = _caches.get(root)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(root)
+            if cache is None:
+                cache = ResultCache(root, _settings["max_bytes"])
+                _caches[root] = cache
+    return cache
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List
+
+# Words remembered per font before the cache starts over
+_MAX_WORDS_PER_FONT = 50_000
+
+# Advance widths at size 1, per font: glyphs and whole words
+_glyphs: Dict[str, Dict[str, float]] = {}
+_words: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _glyph_widths(font: str) -> Dict[str, float]:
+    glyphs = _glyphs.get(font)
+    if glyphs is None:
+        with _lock:
+            glyphs = _glyphs.setdefault(font, {})
+    return glyphs
+
+
+def _unit_width(word: str, font: str) -> float:
+    words = _words.get(font)
+    if words is None:
+        with _lock:
+            words = _words.setdefault(font, {})
+    width = words.get(word)
+    if width is None:
+        glyphs = _glyph_widths(font)
+        width = 0.0
+        for ch in word:
+            w = glyphs.get(ch)
+            if w is None:
+                import fitz  # type: ignore
+
+                w = glyphs[ch] = fitz.get_text_length(ch, fontname=font, fontsize=1)
+            width += w
+        if len(words) >= _MAX_WORDS_PER_FONT:
+            words.clear()
+        words[word] = width
+    return width
+
+
+def text_width(text: str, font: str = "helv", size: float = 11) -> float:
+    """Width of ``text`` in points, as fitz.get_text_length would measure it."""
+    return _unit_width(text, font) * size
+
+
+def wrap(text: str, max_width: float, font: str = "helv", size: float = 11) -> List[str]:
+    """Greedy word wrap of ``text`` into lines no wider than ``max_width``.
+
+    Runs of whitespace collapse to one space. A word wider than a whole line
+    gets a line of its own. Each word is measured once (widths are cached
+    per font), and a line's width is kept as a running sum instead of
+    re-measuring the line as it grows.
+    """
+    words = text.split()
+    if not words:
+        return []
+    space = _unit_width(" ", font) * size
+    lines: List[str] = []
+    line: List[str] = []
+    line_width = 0.0
+    for word in words:
+        width = _unit_width(word, font) * size
+        if line and line_width + space + width > max_width:
+            lines.append(" ".join(line))
+            line, line_width = [], 0.0
+        if line:
+            line_width += space
+        line.append(word)
+        line_width += width
+    lines.append(" ".join(line))
+    return lines
+
+
+def write_pages(
+    doc,
+    paragraphs: Iterable[List[str]],
+    width: float,
+    height: float,
+    margin: float,
+    font: str = "helv",
+    size: float = 11,
+    line_height: float = 16,
+    paragraph_gap: float = 0,
+) -> None:
+    """Append pages to ``doc`` showing each paragraph's wrapped lines.
+
+    Lines go through one Shape per page, so each page gets a single content
+    stream instead of one per line.
+    """
+    page = doc.new_page(width=width, height=height)
+    shape = page.new_shape()
+    y = margin
+    for lines in paragraphs:
+        for line in lines:
+            if y + line_height > height - margin:
+                shape.commit()
+                page = doc.new_page(width=width, height=height)
+                shape = page.new_shape()
+                y = margin
+            shape.insert_text((margin, y), line, fontname=font, fontsize=size)
+            y += line_height
+        y += paragraph_gap
+    shape.commit()